@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from homework import send_message_to_chat
+from settings import MAX_CONCURRENT_REQUESTS
+
+if TYPE_CHECKING:
+    import telegram
+
+_executor = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_REQUESTS,
+    thread_name_prefix='homework-io',
+)
+
+
+async def run_blocking(func, *args):
+    """Выполняет блокирующий вызов в пуле потоков, не блокируя цикл."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, func, *args)
+
+
+async def send_message(bot: telegram.Bot, chat_id, message: str,
+                       parse_mode: str = None):
+    """Асинхронно отправляет сообщение от бота в чат."""
+    return await run_blocking(
+        send_message_to_chat, bot, chat_id, message, parse_mode
+    )
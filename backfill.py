@@ -0,0 +1,130 @@
+import codecs
+import json
+from http import HTTPStatus
+
+from settings import BACKFILL_CHUNK_SIZE, ENDPOINT
+
+WHITESPACE = ' \t\n\r'
+
+
+class JSONStream:
+    """Разбор JSON по мере чтения тела ответа кусками.
+
+    В буфере держится только недочитанный хвост: разобранные
+    значения из него вырезаются при чтении следующего куска.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+
+    def _read(self) -> bool:
+        """Дописывает в буфер следующий кусок; False - тело кончилось."""
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                return True
+        self._decoder.decode(b'', final=True)
+        return False
+
+    def peek(self) -> str:
+        """Следующий символ после пробелов, не сдвигая позицию."""
+        while True:
+            while (self.pos < len(self.buffer)
+                   and self.buffer[self.pos] in WHITESPACE):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read():
+                raise ValueError('Ответ API оборван.')
+
+    def skip(self, char: str) -> bool:
+        """Пропускает символ char, если он следующий."""
+        if self.peek() != char:
+            return False
+        self.pos += 1
+        return True
+
+    def value(self):
+        """Следующее значение JSON целиком.
+
+        Значение, которое упирается в конец буфера, может быть
+        обрезано (например, число), поэтому сначала дочитывается
+        следующий кусок.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+            if end < len(self.buffer) or not self._read():
+                self.pos = end
+                return value
+
+
+def iter_homeworks(chunks):
+    """Домашние работы из тела ответа API по одной.
+
+    chunks - куски тела в байтах. Весь ответ и весь список работ
+    в памяти не собираются; значения остальных ключей, например
+    current_date, пропускаются. Ошибки типа и отсутствия ключа
+    те же, что у check_response.
+    """
+    stream = JSONStream(chunks)
+    if not stream.skip('{'):
+        raise TypeError(
+            'Некорретный тип данных объекта response, '
+            'переданного в check_response.'
+        )
+    found = False
+    while not stream.skip('}'):
+        key = stream.value()
+        if not stream.skip(':'):
+            raise ValueError('Некорректный JSON в ответе API.')
+        if key != 'homeworks':
+            stream.value()
+        elif stream.skip('['):
+            found = True
+            while not stream.skip(']'):
+                yield stream.value()
+                stream.skip(',')
+        else:
+            raise TypeError('Некорректный тип данных объекта homeworks.')
+        stream.skip(',')
+    if not found:
+        raise KeyError('Нет ключа "homeworks" в ответе от API.')
+
+
+def request_chunks(client, headers: dict, timestamp: int = 0,
+                   endpoint: str = ENDPOINT,
+                   chunk_size: int = BACKFILL_CHUNK_SIZE):
+    """Тело ответа API статусов кусками по chunk_size байт.
+
+    client - модуль requests или PracticumClient, None - requests;
+    соединение закрывается, когда тело дочитано или генератор закрыт.
+    """
+    if client is None:
+        import requests
+
+        client = requests
+    response = client.get(
+        endpoint, headers=headers, params={'from_date': int(timestamp)},
+        stream=True,
+    )
+    try:
+        if response.status_code != HTTPStatus.OK:
+            raise Exception(
+                'Ошибка при доступе к API яндекс.Домашки. '
+                f'status_code {response.status_code}'
+            )
+        yield from response.iter_content(chunk_size)
+    finally:
+        response.close()
@@ -0,0 +1,94 @@
+"""Бенчмарк загрузки истории: json.loads против потокового разбора.
+
+Сравнивает пиковую память (tracemalloc) и время разбора ответа API
+с N домашними работами целиком и по кускам BACKFILL_CHUNK_SIZE:
+
+    python benchmarks/bench_backfill.py --homeworks 1000 100000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from backfill import iter_homeworks  # noqa: E402
+from settings import BACKFILL_CHUNK_SIZE  # noqa: E402
+
+
+def make_body(homeworks: int) -> bytes:
+    """Тело ответа API с заданным числом домашних работ."""
+    return json.dumps({
+        'homeworks': [
+            {
+                'id': index,
+                'homework_name': f'hw{index}.zip',
+                'status': 'approved',
+                'reviewer_comment': 'Всё хорошо, принято.',
+                'date_updated': '2022-01-01T00:00:00Z',
+                'lesson_name': f'Урок {index}',
+            }
+            for index in range(homeworks)
+        ],
+        'current_date': 1,
+    }, ensure_ascii=False).encode()
+
+
+def measure(func) -> tuple:
+    """Результат, время и пиковая память вызова func."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_backfill(homeworks: int,
+                   chunk_size: int = BACKFILL_CHUNK_SIZE) -> dict:
+    """Пиковая память и время для обоих способов разбора."""
+    body = make_body(homeworks)
+    chunks = (
+        body[start:start + chunk_size]
+        for start in range(0, len(body), chunk_size)
+    )
+    loaded, loads_seconds, loads_peak = measure(
+        lambda: sum(1 for _ in json.loads(body)['homeworks'])
+    )
+    streamed, stream_seconds, stream_peak = measure(
+        lambda: sum(1 for _ in iter_homeworks(chunks))
+    )
+    assert loaded == streamed == homeworks
+    return {
+        'homeworks': homeworks,
+        'body_bytes': len(body),
+        'loads_peak': loads_peak,
+        'stream_peak': stream_peak,
+        'loads_seconds': loads_seconds,
+        'stream_seconds': stream_seconds,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--homeworks', type=int, nargs='+',
+                        default=[1000, 10000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f'{"homeworks":>10} {"body, KB":>9} {"loads, KB":>10} '
+          f'{"stream, KB":>11} {"loads, s":>9} {"stream, s":>10}')
+    for homeworks in args.homeworks:
+        result = bench_backfill(homeworks)
+        print(f'{homeworks:>10} {result["body_bytes"] / 1024:>9.0f} '
+              f'{result["loads_peak"] / 1024:>10.0f} '
+              f'{result["stream_peak"] / 1024:>11.0f} '
+              f'{result["loads_seconds"]:>9.3f} '
+              f'{result["stream_seconds"]:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
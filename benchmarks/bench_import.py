@@ -0,0 +1,52 @@
+"""Бенчмарк холодного старта: время импорта модулей бота.
+
+Запускает для каждого модуля отдельный интерпретатор с
+python -X importtime и выводит полное время импорта и то,
+подтянулись ли тяжёлые зависимости:
+
+    python benchmarks/bench_import.py homework engine
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('requests', 'telegram', 'telegram.ext', 'http.server')
+
+
+def import_time(module: str) -> dict:
+    """Время импорта модуля в новом процессе и импортированные пакеты."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    imported = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imported[name.strip()] = int(cumulative)
+    return {
+        'module': module,
+        'ms': imported[module] / 1000,
+        'heavy': [name for name in HEAVY_MODULES if name in imported],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=['homework', 'engine'])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f'{"module":>10} {"best, ms":>9}  heavy imports')
+    for module in args.modules:
+        runs = [import_time(module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: run['ms'])
+        print(f'{module:>10} {best["ms"]:>9.1f}  '
+              f'{", ".join(best["heavy"]) or "-"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Бенчмарк цепочки опрос -> разбор -> уведомление.
+
+Опрашивает локальные замены API Практикума и Bot API Telegram
+и выводит число опросов в секунду, задержку опроса (p50/p99)
+и память на подписку для нескольких размеров реестра:
+
+    python benchmarks/bench_pipeline.py --subscribers 1 100 10000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [BASE_DIR, os.path.join(BASE_DIR, 'tests')]
+
+import telegram  # noqa: E402
+from telegram.utils.request import Request  # noqa: E402
+
+from engine import Engine  # noqa: E402
+from fake_servers import FakePracticumServer, FakeTelegramServer  # noqa
+from homework import check_response, new_status_messages  # noqa: E402
+from http_client import PracticumClient  # noqa: E402
+from storage import StateStore  # noqa: E402
+from subscriptions import SubscriptionRegistry  # noqa: E402
+
+BOT_TOKEN = '123456:bench'
+
+
+def percentile(values: list, percent: int) -> float:
+    """Перцентиль выборки; для одного значения - само значение."""
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+def bench_parse(iterations: int = 100000) -> float:
+    """Разборов ответа в секунду: check_response + new_status_messages."""
+    response = {
+        'homeworks': [
+            {'id': 1, 'homework_name': 'hw.zip', 'status': 'approved'}
+        ],
+        'current_date': 1,
+    }
+    started = time.perf_counter()
+    for _ in range(iterations):
+        # Без известных статусов каждая работа считается изменившейся.
+        new_status_messages(check_response(response), {})
+    return iterations / (time.perf_counter() - started)
+
+
+def seed(practicum: FakePracticumServer, subscribers: int,
+         change_rate: float, now: int) -> None:
+    """Создаёт домашки подписчиков и меняет статус части из них."""
+    changed = int(subscribers * change_rate)
+    for index in range(subscribers):
+        token = f'token{index}'
+        practicum.set_status(token, 1, 'reviewing', updated_at=now - 3600)
+        if index < changed:
+            practicum.set_status(token, 1, 'approved', updated_at=now)
+
+
+def build_registry(subscribers: int, now: int) -> SubscriptionRegistry:
+    """Реестр подписок с курсором в прошлом."""
+    registry = SubscriptionRegistry()
+    for index in range(subscribers):
+        registry.add(f'token{index}', index + 1, timestamp=now - 60)
+    return registry
+
+
+def memory_per_subscriber(subscribers: int, now: int) -> float:
+    """Память на подписку после разбора одного ответа с домашкой."""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    registry = build_registry(subscribers, now)
+    engine = Engine(registry, None, store=StateStore())
+    for index, subscription in enumerate(registry):
+        engine.process_response(subscription, {
+            'homeworks': [{
+                'id': 1,
+                'homework_name': f'token{index}__hw1.zip',
+                'status': 'approved',
+            }],
+            'current_date': now,
+        })
+    memory = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return memory / subscribers
+
+
+async def run_cycle(engine: Engine, concurrency: int) -> tuple:
+    """Один опрос каждой подписки; возвращает длительность и задержки."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def poll(subscription):
+        async with semaphore:
+            started = time.perf_counter()
+            await engine.poll_async(subscription)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(poll(sub) for sub in engine.registry))
+    return time.perf_counter() - started, latencies
+
+
+def bench_pipeline(subscribers: int, concurrency: int = 32,
+                   change_rate: float = 0.1, latency: float = 0,
+                   error_rate: float = 0) -> dict:
+    """Прогоняет цикл опроса всех подписок через локальные серверы."""
+    practicum = FakePracticumServer(latency=latency, error_rate=error_rate)
+    with practicum, FakeTelegramServer() as tg:
+        bot = telegram.Bot(
+            token=BOT_TOKEN,
+            base_url=tg.base_url,
+            request=Request(con_pool_size=concurrency),
+        )
+        client = PracticumClient(pool_size=concurrency)
+        now = int(time.time())
+        seed(practicum, subscribers, change_rate, now)
+        engine = Engine(build_registry(subscribers, now), bot, client,
+                        StateStore(), endpoint=practicum.endpoint)
+
+        duration, latencies = asyncio.run(run_cycle(engine, concurrency))
+        client.close()
+        return {
+            'subscribers': subscribers,
+            'polls_per_sec': subscribers / duration,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'bytes_per_subscriber': memory_per_subscriber(subscribers, now),
+            'messages': len(tg.messages),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--subscribers', type=int, nargs='+',
+                        default=[1, 100, 10000])
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--change-rate', type=float, default=0.1)
+    parser.add_argument('--latency', type=float, default=0,
+                        help='задержка ответа API, с')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='доля ответов API с ошибкой 500')
+    args = parser.parse_args(argv)
+    logging.disable(logging.CRITICAL)
+
+    print(f'parse: {bench_parse():.0f} responses/sec')
+    print(f'{"subscribers":>11} {"polls/sec":>10} {"p50, ms":>8} '
+          f'{"p99, ms":>8} {"B/sub":>8} {"sent":>6}')
+    for subscribers in args.subscribers:
+        result = bench_pipeline(
+            subscribers, args.concurrency, args.change_rate,
+            args.latency, args.error_rate,
+        )
+        print(f'{result["subscribers"]:>11} {result["polls_per_sec"]:>10.0f} '
+              f'{result["p50_ms"]:>8.2f} {result["p99_ms"]:>8.2f} '
+              f'{result["bytes_per_subscriber"]:>8.0f} '
+              f'{result["messages"]:>6}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Бенчмарк таймеров опроса: куча heapq против колеса таймеров.
+
+Ставит N таймеров, равномерно распределённых по RETRY_PERIOD,
+отменяет 10% из них и продвигает время по тику до конца окна:
+
+    python benchmarks/bench_timers.py --timers 10000 1000000
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from settings import RETRY_PERIOD  # noqa: E402
+from timing_wheel import TimingWheel  # noqa: E402
+
+
+def bench_heap(dues: list, cancelled: set, period: int) -> dict:
+    """Куча с ленивой отменой: отменённые пропускаются при извлечении."""
+    started = time.perf_counter()
+    queue = []
+    for key, due in enumerate(dues):
+        heapq.heappush(queue, (due, key))
+    inserted = time.perf_counter()
+    alive = set(range(len(dues))) - cancelled
+    cancelled_at = time.perf_counter()
+    fired = 0
+    for now in range(period + 1):
+        while queue and queue[0][0] <= now:
+            _, key = heapq.heappop(queue)
+            fired += key in alive
+    finished = time.perf_counter()
+    return {
+        'insert': inserted - started,
+        'cancel': cancelled_at - inserted,
+        'fire': finished - cancelled_at,
+        'fired': fired,
+    }
+
+
+def bench_wheel(dues: list, cancelled: set, period: int) -> dict:
+    """Колесо таймеров с отменой O(1)."""
+    started = time.perf_counter()
+    wheel = TimingWheel(0)
+    for key, due in enumerate(dues):
+        wheel.add(key, due)
+    inserted = time.perf_counter()
+    for key in cancelled:
+        wheel.cancel(key)
+    cancelled_at = time.perf_counter()
+    fired = 0
+    for now in range(period + 1):
+        fired += len(wheel.advance(now))
+    finished = time.perf_counter()
+    return {
+        'insert': inserted - started,
+        'cancel': cancelled_at - inserted,
+        'fire': finished - cancelled_at,
+        'fired': fired,
+    }
+
+
+def bench_timers(timers: int, period: int = RETRY_PERIOD,
+                 seed: int = 0) -> dict:
+    """Время постановки, отмены и срабатывания таймеров для обоих способов."""
+    rng = random.Random(seed)
+    dues = [rng.uniform(0, period) for _ in range(timers)]
+    cancelled = set(rng.sample(range(timers), timers // 10))
+    heap = bench_heap(dues, cancelled, period)
+    wheel = bench_wheel(dues, cancelled, period)
+    assert heap['fired'] == wheel['fired'] == timers - len(cancelled)
+    return {'timers': timers, 'heap': heap, 'wheel': wheel}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--timers', type=int, nargs='+',
+                        default=[10000, 100000, 1000000])
+    parser.add_argument('--period', type=int, default=RETRY_PERIOD)
+    args = parser.parse_args(argv)
+
+    print(f'{"timers":>8} {"":>6} {"insert, s":>10} {"cancel, s":>10} '
+          f'{"fire, s":>8}')
+    for timers in args.timers:
+        result = bench_timers(timers, args.period)
+        for name in ('heap', 'wheel'):
+            stats = result[name]
+            print(f'{timers:>8} {name:>6} {stats["insert"]:>10.3f} '
+                  f'{stats["cancel"]:>10.3f} {stats["fire"]:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Микробенчмарк проверки ответа API.
+
+Сравнивает разбор ответа через check_response + new_status_messages
+и через скомпилированную схему parse_response + changed_homeworks:
+
+    python benchmarks/bench_validation.py --homeworks 1 10 100
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from homework import check_response, new_status_messages  # noqa: E402
+from schema import changed_homeworks, parse_response  # noqa: E402
+
+
+def make_response(homeworks: int) -> dict:
+    """Ответ API с заданным числом домашних работ."""
+    return {
+        'homeworks': [
+            {
+                'id': index,
+                'homework_name': f'hw{index}.zip',
+                'status': 'approved',
+                'reviewer_comment': '',
+                'date_updated': '2022-01-01T00:00:00Z',
+                'lesson_name': f'Урок {index}',
+            }
+            for index in range(homeworks)
+        ],
+        'current_date': 1,
+    }
+
+
+def dict_path(response: dict) -> list:
+    return [
+        message
+        for _, _, message in new_status_messages(check_response(response), {})
+    ]
+
+
+def schema_path(response: dict) -> list:
+    return [
+        homework.message
+        for homework in changed_homeworks(
+            parse_response(response).homeworks, {}
+        )
+    ]
+
+
+def responses_per_sec(parse, response: dict, iterations: int) -> float:
+    """Разборов ответа в секунду."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        parse(response)
+    return iterations / (time.perf_counter() - started)
+
+
+def bench_validation(homeworks: int, iterations: int = 20000) -> dict:
+    """Скорость обоих способов разбора одного и того же ответа."""
+    response = make_response(homeworks)
+    assert dict_path(response) == schema_path(response)
+    dicts = responses_per_sec(dict_path, response, iterations)
+    compiled = responses_per_sec(schema_path, response, iterations)
+    return {
+        'homeworks': homeworks,
+        'dicts_per_sec': dicts,
+        'schema_per_sec': compiled,
+        'speedup': compiled / dicts,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--homeworks', type=int, nargs='+',
+                        default=[1, 10, 100])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args(argv)
+    logging.disable(logging.CRITICAL)
+
+    print(f'{"homeworks":>9} {"dicts/sec":>10} {"schema/sec":>11} '
+          f'{"speedup":>8}')
+    for homeworks in args.homeworks:
+        result = bench_validation(homeworks, args.iterations)
+        print(f'{result["homeworks"]:>9} {result["dicts_per_sec"]:>10.0f} '
+              f'{result["schema_per_sec"]:>11.0f} '
+              f'{result["speedup"]:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import logging
+import threading
+import time
+
+from metrics import CIRCUIT_BREAKER_STATE
+from settings import BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+STATE_CODES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitBreaker:
+    """Предохранитель запросов к одному адресу API.
+
+    После failure_threshold ошибок подряд предохранитель открывается,
+    и запросы не выполняются. Через reset_timeout секунд пропускается
+    один пробный запрос: если он успешен, предохранитель закрывается,
+    если нет - снова открывается на reset_timeout.
+    """
+
+    def __init__(self, endpoint: str,
+                 failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT,
+                 clock=time.monotonic):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.rejected_count = 0
+        CIRCUIT_BREAKER_STATE.labels(endpoint).set(0)
+
+    def allow(self) -> bool:
+        """Решает, выполнять ли запрос.
+
+        В открытом состоянии по истечении reset_timeout разрешает
+        ровно один пробный запрос, остальные отклоняются до его
+        результата.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if (self.state == OPEN
+                    and self.clock() - self.opened_at >= self.reset_timeout):
+                self._set_state(HALF_OPEN)
+                logging.info('Пробный запрос к %s.', self.endpoint)
+                return True
+            self.rejected_count += 1
+            return False
+
+    def record_success(self) -> None:
+        """Учитывает успешный запрос: API доступен."""
+        with self._lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                logging.info('API %s снова доступен.', self.endpoint)
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        """Учитывает ошибку сети или сервера API."""
+        with self._lock:
+            self.failures += 1
+            if (self.state == HALF_OPEN
+                    or self.failures >= self.failure_threshold):
+                if self.state != OPEN:
+                    logging.error(
+                        'API %s недоступен, запросы приостановлены на %s с.',
+                        self.endpoint, self.reset_timeout,
+                    )
+                self.opened_at = self.clock()
+                self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_BREAKER_STATE.labels(self.endpoint).set(STATE_CODES[state])
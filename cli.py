@@ -0,0 +1,171 @@
+"""Разовый запуск бота для cron и serverless-функций.
+
+    python -m homework poll-once   # один опрос всех подписок
+    python -m homework backfill    # загрузить историю статусов
+    python -m homework status      # курсоры и статусы из хранилища
+
+Процесс выполняет одну команду по сохранённым курсорам и завершается,
+выводя её длительность.
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+import sys
+import time
+
+from settings import DELIVERY_STOP_TIMEOUT
+
+REPORT_LABELS = {
+    'subscriptions': 'подписок',
+    'tokens': 'токенов',
+    'homeworks': 'работ',
+    'sent': 'отправлено',
+    'failed': 'не отправлено',
+    'errors': 'ошибок',
+    'poll_seconds': 'опрос',
+    'send_seconds': 'отправка',
+}
+
+
+def poll_once(engine) -> dict:
+    """Один цикл опроса всех подписок с отправкой сообщений.
+
+    Сообщения, не отправленные за DELIVERY_STOP_TIMEOUT секунд,
+    считаются неотправленными; статусы и курсоры их подписок
+    не сохраняются, и следующий запуск отправит их снова.
+    """
+    started = time.perf_counter()
+    polled = asyncio.run(engine.poll_once())
+    polled_at = time.perf_counter()
+    engine.delivery.stop(timeout=DELIVERY_STOP_TIMEOUT)
+    return {
+        'subscriptions': polled,
+        'sent': engine.delivery.sent_count,
+        'failed': engine.delivery.failed_count + len(engine.delivery),
+        'errors': engine.errors_count,
+        'poll_seconds': polled_at - started,
+        'send_seconds': time.perf_counter() - polled_at,
+    }
+
+
+def backfill(engine) -> dict:
+    """Загружает историю статусов всех токенов без уведомлений.
+
+    API запрашивается один раз на токен, а не на подписку.
+    """
+    started = time.perf_counter()
+    tokens = dict.fromkeys(
+        subscription.token for subscription in engine.registry
+    )
+    homeworks = errors = 0
+    for token in tokens:
+        try:
+            homeworks += engine.backfill_token(token)
+        except Exception as error:
+            logging.error('Сбой загрузки истории токена ...%s: %s',
+                          token[-4:], error)
+            errors += 1
+    engine.store.flush()
+    return {
+        'subscriptions': len(engine.registry),
+        'tokens': len(tokens),
+        'homeworks': homeworks,
+        'errors': errors,
+        'poll_seconds': time.perf_counter() - started,
+    }
+
+
+def status_lines(engine) -> list:
+    """Курсоры, последние ошибки и статусы работ всех подписок."""
+    lines = []
+    for subscription in engine.registry:
+        cursor = datetime.datetime.fromtimestamp(
+            subscription.timestamp, datetime.timezone.utc
+        )
+        lines.append(
+            f'Чат {subscription.chat_id}, токен ...{subscription.token[-4:]}: '
+            f'курсор {cursor:%Y-%m-%d %H:%M:%S} UTC'
+        )
+        if subscription.last_message:
+            lines.append(f'  Ошибка: {subscription.last_message}')
+        statuses = engine.store.load_statuses(subscription.key)
+        for key, status in sorted(statuses.items()):
+            lines.append(f'  Работа {key}: {status}')
+    return lines
+
+
+def build_engine(command: str):
+    """Engine по подпискам и курсорам из хранилища STATE_DB.
+
+    Бот и очередь отправки создаются только для poll-once,
+    HTTP-клиент - только для команд, которые обращаются к API.
+    """
+    import engine
+    from delivery import DeliveryQueue
+    from http_client import PracticumClient
+    from storage import open_store
+
+    if command == 'poll-once' and not engine.TELEGRAM_TOKEN:
+        logging.critical('Токен телеграм-бота недоступен.')
+        sys.exit(1)
+    store = open_store(engine.STATE_DB_PATH, engine.STATE_DB_JOURNAL)
+    registry = engine.load_registry(store)
+    if command == 'status':
+        return engine.Engine(registry, None, None, store)
+    if command == 'backfill':
+        return engine.Engine(
+            registry, None, PracticumClient(), store, endpoint=engine.ENDPOINT
+        )
+    bot = engine.make_bot()
+    renderer = engine.make_renderer()
+    delivery = DeliveryQueue(bot, parse_mode=renderer.parse_mode).start()
+    return engine.Engine(
+        registry, bot, PracticumClient(), store, delivery,
+        endpoint=engine.ENDPOINT, renderer=renderer,
+    )
+
+
+def report(command: str, result: dict, elapsed: float) -> str:
+    """Строка итога команды с длительностью."""
+    fields = ', '.join(
+        f'{REPORT_LABELS[name]} {value:.3f} с' if isinstance(value, float)
+        else f'{REPORT_LABELS[name]} {value}'
+        for name, value in result.items()
+    )
+    return f'{command}: {fields}, всего {elapsed:.3f} с'
+
+
+def run(argv=None) -> int:
+    """Выполняет команду и возвращает код выхода процесса.
+
+    Код 1 - при опросе были ошибки API или не отправились сообщения.
+    """
+    from homework import configure_logging
+
+    parser = argparse.ArgumentParser(
+        prog='python -m homework', description=__doc__.splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('poll-once', help='опросить все подписки один раз')
+    commands.add_parser('backfill', help='загрузить историю статусов')
+    commands.add_parser('status', help='показать состояние подписок')
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    started = time.perf_counter()
+    engine = build_engine(args.command)
+    try:
+        if args.command == 'poll-once':
+            result = poll_once(engine)
+        elif args.command == 'backfill':
+            result = backfill(engine)
+        else:
+            print('\n'.join(status_lines(engine)) or 'Подписок нет.')
+            result = {'subscriptions': len(engine.registry)}
+    finally:
+        if engine.client is not None:
+            engine.client.close()
+        engine.store.close()
+    print(report(args.command, result, time.perf_counter() - started))
+    return int(bool(result.get('errors') or result.get('failed')))
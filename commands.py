@@ -0,0 +1,102 @@
+import logging
+import secrets
+
+import telegram
+from telegram.ext import CommandHandler, Updater
+
+START_HELP = (
+    'Отправьте /start <токен Практикума>, чтобы получать сообщения '
+    'об изменении статуса домашек. /status - последние статусы, '
+    '/stop - отписаться.'
+)
+
+
+class Commands:
+    """Команды чата: подписка, отписка и статусы домашек.
+
+    /status отвечает из статусов, которые уже есть у бота,
+    без запросов к API Практикума.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def handlers(self) -> list:
+        """Обработчики команд для диспетчера."""
+        return [
+            CommandHandler('start', self.start),
+            CommandHandler('stop', self.stop),
+            CommandHandler('status', self.status),
+        ]
+
+    def start(self, update: telegram.Update, context) -> None:
+        """Подписывает чат на статусы домашек по токену."""
+        chat_id = update.effective_chat.id
+        if not context.args:
+            update.effective_message.reply_text(START_HELP)
+            return
+        self.engine.subscribe(context.args[0], chat_id)
+        try:
+            update.effective_message.delete()
+        except telegram.error.TelegramError as error:
+            logging.warning('Не удалось удалить сообщение с токеном: %s',
+                            error)
+        update.effective_message.reply_text(
+            'Подписка оформлена. Бот напишет, когда статус '
+            'домашки изменится.'
+        )
+
+    def stop(self, update: telegram.Update, context) -> None:
+        """Отписывает чат от всех токенов."""
+        if self.engine.unsubscribe(update.effective_chat.id):
+            update.effective_message.reply_text('Подписка отменена.')
+        else:
+            update.effective_message.reply_text(START_HELP)
+
+    def status(self, update: telegram.Update, context) -> None:
+        """Отправляет последние известные статусы домашек чата."""
+        update.effective_message.reply_text(
+            status_text(self.engine, update.effective_chat.id)
+        )
+
+
+def status_text(engine, chat_id) -> str:
+    """Последние известные статусы домашек всех подписок чата."""
+    subscriptions = engine.chat_subscriptions(chat_id)
+    if not subscriptions:
+        return START_HELP
+    lines = [
+        f'Работа "{engine.homework_name(key)}": '
+        f'{engine.renderer.verdict(code)}'
+        for subscription in subscriptions
+        for key, code in list(engine.statuses(subscription).items())
+    ]
+    return '\n'.join(lines) or 'Статусов домашек пока нет.'
+
+
+def build_updater(engine, bot: telegram.Bot, workers: int = 4) -> Updater:
+    """Updater с обработчиками команд, работающий через бота engine."""
+    updater = Updater(bot=bot, workers=workers)
+    for handler in Commands(engine).handlers():
+        updater.dispatcher.add_handler(handler)
+    return updater
+
+
+def start_webhook(updater: Updater, webhook_url: str, port: int,
+                  listen: str = '0.0.0.0', url_path: str = '') -> None:
+    """Принимает команды через вебхук Telegram, а не getUpdates.
+
+    Telegram присылает обновления на webhook_url/url_path,
+    HTTP-сервер Updater слушает listen:port. Telegram 13 не проверяет
+    секрет вебхука, поэтому путь должен быть неугадываемым: без
+    url_path при каждом запуске берётся случайный.
+    """
+    url_path = url_path or secrets.token_urlsafe(32)
+    updater.start_webhook(
+        listen=listen,
+        port=port,
+        url_path=url_path,
+        webhook_url=f'{webhook_url.rstrip("/")}/{url_path}',
+        allowed_updates=['message'],
+    )
+    logging.info('Команды принимаются через вебхук на порту %s.', port)
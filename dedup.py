@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import SUPPRESSED_MESSAGES
+from settings import (
+    DEDUP_MAX_SIZE, DEDUP_STATUS_TTL, ERROR_SUPPRESSION_WINDOW,
+)
+
+
+class TTLCache:
+    """Словарь ограниченного размера с временем жизни записей.
+
+    Записи старше ttl секунд считаются отсутствующими, при переполнении
+    вытесняется запись, к которой дольше всего не обращались.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """Значение ключа или default, если его нет или оно устарело."""
+        item = self._items.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at <= self.clock():
+            del self._items[key]
+            return default
+        self._items.move_to_end(key)
+        return value
+
+    def pop(self, key) -> None:
+        """Удаляет ключ, если он есть."""
+        self._items.pop(key, None)
+
+    def set(self, key, value) -> None:
+        """Запоминает значение ключа на ttl секунд."""
+        self._items[key] = (value, self.clock() + self.ttl)
+        self._items.move_to_end(key)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+
+class Deduplicator:
+    """Отсеивает повторные уведомления чатам.
+
+    Статус домашней работы не отправляется в чат повторно, пока
+    он не сменился; ошибка с тем же текстом не отправляется в чат
+    чаще раза в error_window секунд, даже если между повторами
+    были другие ошибки. Память ограничена maxsize записями.
+    """
+
+    def __init__(self, maxsize: int = DEDUP_MAX_SIZE,
+                 status_ttl: float = DEDUP_STATUS_TTL,
+                 error_window: float = ERROR_SUPPRESSION_WINDOW,
+                 clock=time.monotonic):
+        self._lock = threading.Lock()
+        self._statuses = TTLCache(maxsize, status_ttl, clock)
+        self._errors = TTLCache(maxsize, error_window, clock)
+
+    def status_is_new(self, chat_id, homework_key, status) -> bool:
+        """Нужно ли сообщать чату о статусе домашней работы."""
+        key = (str(chat_id), homework_key)
+        with self._lock:
+            if self._statuses.get(key) == status:
+                SUPPRESSED_MESSAGES.labels('status').inc()
+                return False
+            self._statuses.set(key, status)
+        return True
+
+    def forget(self, chat_id, homework_key) -> None:
+        """Забывает статус работы, о котором чат не получил сообщения."""
+        with self._lock:
+            self._statuses.pop((str(chat_id), homework_key))
+
+    def error_is_new(self, chat_id, error: str) -> bool:
+        """Нужно ли сообщать чату об ошибке."""
+        key = (str(chat_id), error)
+        with self._lock:
+            if self._errors.get(key):
+                SUPPRESSED_MESSAGES.labels('error').inc()
+                return False
+            self._errors.set(key, True)
+        return True
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from metrics import SEND_MESSAGE_FAILURES, SEND_MESSAGE_SECONDS
+from settings import (
+    DELIVERY_MAX_RETRIES, MAX_MESSAGE_LENGTH, TELEGRAM_CHAT_INTERVAL,
+    TELEGRAM_GLOBAL_RATE,
+)
+
+if TYPE_CHECKING:
+    import telegram
+
+MESSAGE_SEPARATOR = '\n\n'
+
+
+class TokenBucket:
+    """Ограничитель частоты: rate токенов в секунду, запас capacity."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def take(self, now: float = None) -> float:
+        """Берёт токен; возвращает 0 или сколько секунд ждать до токена."""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class DeliveryQueue:
+    """Очередь исходящих сообщений в Telegram.
+
+    Сообщения отправляются отдельным потоком, независимо от опроса API.
+    Общая частота ограничена TELEGRAM_GLOBAL_RATE сообщений в секунду,
+    в один чат - одним сообщением за TELEGRAM_CHAT_INTERVAL секунд.
+    Все сообщения отправляются с разметкой parse_mode.
+    Несколько сообщений, ожидающих отправки в один чат, склеиваются
+    в одно. При ответе 429 отправка в чат откладывается на retry_after,
+    при сбое сети повторяется; сообщение, которое Telegram отклонил
+    (BadRequest, Unauthorized), не повторяется.
+    Обработчик on_done сообщения вызывается с True после отправки
+    и с False, если сообщение отброшено.
+    """
+
+    def __init__(self, bot: telegram.Bot,
+                 global_rate: float = TELEGRAM_GLOBAL_RATE,
+                 chat_interval: float = TELEGRAM_CHAT_INTERVAL,
+                 max_retries: int = DELIVERY_MAX_RETRIES,
+                 parse_mode: str = None):
+        self.bot = bot
+        self.parse_mode = parse_mode
+        self.bucket = TokenBucket(global_rate)
+        self.chat_interval = chat_interval
+        self.max_retries = max_retries
+        self._condition = threading.Condition()
+        self._pending = {}
+        self._retries = {}
+        self._chat_ready_at = {}
+        self._queue = []
+        self._counter = itertools.count()
+        self._thread = None
+        self._stopped = False
+        self._sending = False
+        self.sent_count = 0
+        self.failed_count = 0
+
+    def __len__(self):
+        with self._condition:
+            return sum(len(messages) for messages in self._pending.values())
+
+    def put(self, chat_id, message: str, on_done=None) -> None:
+        """Ставит сообщение в очередь на отправку в чат."""
+        callbacks = () if on_done is None else (on_done,)
+        with self._condition:
+            self._enqueue(
+                str(chat_id), [(message, callbacks)], time.monotonic()
+            )
+            self._condition.notify()
+
+    def _enqueue(self, chat_id: str, messages: list, ready_at: float,
+                 front: bool = False) -> None:
+        if chat_id in self._pending:
+            if front:
+                self._pending[chat_id][:0] = messages
+            else:
+                self._pending[chat_id].extend(messages)
+            return
+        self._pending[chat_id] = list(messages)
+        ready_at = max(ready_at, self._chat_ready_at.get(chat_id, 0))
+        heapq.heappush(self._queue, (ready_at, next(self._counter), chat_id))
+
+    def _take_batch(self, chat_id: str) -> tuple:
+        """Склеивает ожидающие сообщения чата в пределах длины сообщения."""
+        messages = self._pending.pop(chat_id)
+        text, callbacks = messages.pop(0)
+        batch = [text]
+        length = len(text)
+        while messages:
+            length += len(MESSAGE_SEPARATOR) + len(messages[0][0])
+            if length > MAX_MESSAGE_LENGTH:
+                break
+            text, more = messages.pop(0)
+            batch.append(text)
+            callbacks += more
+        if messages:
+            self._pending[chat_id] = messages
+        return MESSAGE_SEPARATOR.join(batch), callbacks, messages
+
+    def _next(self):
+        """Ждёт чат, в который можно отправлять; None - очередь закрыта."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if self._queue and self._queue[0][0] <= now:
+                    ready_at, _, chat_id = self._queue[0]
+                    if self._chat_ready_at.get(chat_id, 0) > ready_at:
+                        heapq.heapreplace(self._queue, (
+                            self._chat_ready_at[chat_id],
+                            next(self._counter),
+                            chat_id,
+                        ))
+                        continue
+                    wait = self.bucket.take(now)
+                    if not wait:
+                        _, _, chat_id = heapq.heappop(self._queue)
+                        text, callbacks, rest = self._take_batch(chat_id)
+                        ready_at = now + self.chat_interval
+                        self._chat_ready_at[chat_id] = ready_at
+                        if rest:
+                            heapq.heappush(
+                                self._queue,
+                                (ready_at, next(self._counter), chat_id),
+                            )
+                        self._sending = True
+                        return chat_id, text, callbacks
+                elif self._stopped and not self._queue:
+                    return None
+                elif self._queue:
+                    wait = self._queue[0][0] - now
+                else:
+                    self._chat_ready_at = {
+                        chat_id: ready_at
+                        for chat_id, ready_at in self._chat_ready_at.items()
+                        if ready_at > now
+                    }
+                    wait = None
+                self._condition.wait(wait)
+
+    def _send(self, chat_id: str, text: str, callbacks: tuple) -> None:
+        import telegram
+
+        try:
+            with SEND_MESSAGE_SECONDS.time():
+                self.bot.send_message(
+                    chat_id=chat_id, text=text, parse_mode=self.parse_mode
+                )
+        except telegram.error.RetryAfter as error:
+            SEND_MESSAGE_FAILURES.labels(type(error).__name__).inc()
+            logging.warning(
+                'Telegram ограничил отправку в чат %s, повтор через %s с.',
+                chat_id, error.retry_after,
+            )
+            self._retry(chat_id, text, callbacks, error.retry_after)
+        except (telegram.error.BadRequest,
+                telegram.error.Unauthorized) as error:
+            SEND_MESSAGE_FAILURES.labels(type(error).__name__).inc()
+            logging.error(
+                'Telegram отклонил сообщение в чат %s: %s', chat_id, error
+            )
+            self._fail(callbacks)
+        except telegram.error.NetworkError as error:
+            SEND_MESSAGE_FAILURES.labels(type(error).__name__).inc()
+            logging.warning('%s: сбой сети при отправке сообщения.', error)
+            self._retry(chat_id, text, callbacks, self.chat_interval)
+        except Exception as error:
+            SEND_MESSAGE_FAILURES.labels(type(error).__name__).inc()
+            logging.error('%s: ошибка при отправке сообщения ботом.', error)
+            self._fail(callbacks)
+        else:
+            self.sent_count += 1
+            self._retries.pop(chat_id, None)
+            logging.debug('Бот отправил сообщение.')
+            self._done(callbacks, True)
+
+    def _retry(self, chat_id: str, text: str, callbacks: tuple,
+               delay: float) -> None:
+        retries = self._retries.get(chat_id, 0) + 1
+        if retries > self.max_retries:
+            self._retries.pop(chat_id, None)
+            logging.error(
+                'Сообщение в чат %s не отправлено после %s попыток.',
+                chat_id, self.max_retries,
+            )
+            self._fail(callbacks)
+            return
+        self._retries[chat_id] = retries
+        with self._condition:
+            ready_at = time.monotonic() + delay
+            self._chat_ready_at[chat_id] = ready_at
+            self._enqueue(chat_id, [(text, callbacks)], ready_at, front=True)
+            self._condition.notify()
+
+    def _fail(self, callbacks: tuple) -> None:
+        self.failed_count += 1
+        self._done(callbacks, False)
+
+    def _done(self, callbacks: tuple, sent: bool) -> None:
+        for on_done in callbacks:
+            try:
+                on_done(sent)
+            except Exception as error:
+                logging.error('Сбой обработчика доставки сообщения: %s', error)
+
+    def run(self) -> None:
+        """Отправляет сообщения, пока очередь не будет закрыта."""
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            try:
+                self._send(*item)
+            finally:
+                with self._condition:
+                    self._sending = False
+                    self._condition.notify_all()
+
+    def start(self) -> 'DeliveryQueue':
+        """Запускает отправку сообщений в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self.run, name='telegram-delivery', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def join(self, timeout: float = None) -> bool:
+        """Ждёт, пока все сообщения будут отправлены."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._sending:
+                wait = (
+                    None if deadline is None
+                    else deadline - time.monotonic()
+                )
+                if wait is not None and wait <= 0:
+                    return False
+                self._condition.wait(wait)
+        return True
+
+    def stop(self, timeout: float = None) -> None:
+        """Отправляет оставшиеся сообщения и останавливает поток."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
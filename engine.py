@@ -0,0 +1,827 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import aio
+import backfill
+from dedup import Deduplicator, TTLCache
+from delivery import DeliveryQueue
+from exceptions import CircuitOpen, NoNewStatus, NotModified
+import metrics
+from http_client import PracticumClient
+from log_config import worker_log_file
+from homework import (
+    PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_TOKEN, configure_logging,
+    make_headers, request_homework_statuses, send_message_to_chat,
+)
+from schema import (
+    changed_homeworks, make_homework, parse_response, status_codes,
+)
+from sharding import LeaseTable, Shard
+from singleflight import SingleFlight
+from settings import (
+    DEDUP_MAX_SIZE, DEDUP_STATUS_TTL, DELIVERY_STOP_TIMEOUT, ENDPOINT,
+    INGEST_PORT, INGEST_SPOOL, LOG_FILE, MAX_BACKOFF_STEPS,
+    MAX_CONCURRENT_POLLS, MAX_CONCURRENT_REQUESTS, MAX_RETRY_PERIOD,
+    MESSAGE_FORMAT, MESSAGE_LOCALE, METRICS_PORT, RECONCILE_PERIOD,
+    RETRY_PERIOD, REVIEWING_PERIOD, SCHEDULER_JITTER, SCHEDULER_TICK,
+    SHARD_HEARTBEAT, SHARD_WORKERS, STATE_DB, STATE_FLUSH_BATCH,
+    STATE_FLUSH_INTERVAL, SUBSCRIPTIONS_FILE, TELEGRAM_GLOBAL_RATE,
+    TEMPLATES_FILE, WEBHOOK_LISTEN, WEBHOOK_PATH, WEBHOOK_PORT,
+)
+from metrics import HTTP_CLIENT, POLL_LAG_SECONDS
+from storage import SQLiteStateStore, StateStore, open_store
+from subscriptions import SubscriptionRegistry
+from templates import MessageRenderer, load_templates
+from timing_wheel import TimingWheel
+
+if TYPE_CHECKING:
+    import ingest
+    import telegram
+
+SUBSCRIPTIONS_PATH = os.getenv('SUBSCRIPTIONS_FILE', SUBSCRIPTIONS_FILE)
+STATE_DB_PATH = os.getenv('STATE_DB', STATE_DB)
+METRICS_PORT_NUMBER = int(os.getenv('METRICS_PORT', METRICS_PORT))
+INGEST_PORT_NUMBER = int(os.getenv('INGEST_PORT', INGEST_PORT))
+INGEST_SPOOL_PATH = os.getenv('INGEST_SPOOL', INGEST_SPOOL)
+INGEST_SECRET = os.getenv('INGEST_SECRET', '')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+WEBHOOK_PORT_NUMBER = int(
+    os.getenv('WEBHOOK_PORT', os.getenv('PORT', WEBHOOK_PORT))
+)
+WEBHOOK_URL_PATH = os.getenv('WEBHOOK_PATH', WEBHOOK_PATH)
+SHARD_WORKERS_COUNT = int(os.getenv('SHARD_WORKERS', SHARD_WORKERS))
+SHARD_ID = os.getenv('SHARD_ID', '')
+STATE_DB_JOURNAL = os.getenv(
+    'STATE_DB_JOURNAL', 'DELETE' if SHARD_ID else 'WAL'
+)
+TEMPLATES_PATH = os.getenv('TEMPLATES_FILE', TEMPLATES_FILE)
+LOCALE = os.getenv('MESSAGE_LOCALE', MESSAGE_LOCALE)
+FORMAT = os.getenv('MESSAGE_FORMAT', MESSAGE_FORMAT)
+
+
+class Scheduler:
+    """Адаптивный планировщик опросов всех подписок в одном процессе.
+
+    Новые подписки равномерно распределяются по окну RETRY_PERIOD.
+    Работы на ревью опрашиваются раз в REVIEWING_PERIOD, а подписки
+    без изменений - всё реже, вплоть до MAX_RETRY_PERIOD. Интервалы
+    случайно растягиваются на ±SCHEDULER_JITTER, чтобы опросы
+    не собирались в пики. Подписки с одним токеном и курсором
+    опрашиваются одновременно, чтобы их запросы объединялись.
+    Подписки, для которых owns возвращает False, остаются в очереди,
+    но не опрашиваются: их опрашивает другой воркер.
+
+    Время следующего опроса хранится в иерархическом колесе таймеров
+    с шагом tick, поэтому постановка и отмена опроса стоят O(1).
+    Колесо не потокобезопасно, поэтому все операции с ним идут
+    под блокировкой: cancel вызывается из потоков команд чата.
+    """
+
+    def __init__(self, registry: SubscriptionRegistry, period=RETRY_PERIOD,
+                 jitter=SCHEDULER_JITTER, reviewing_period=REVIEWING_PERIOD,
+                 owns=None, tick=SCHEDULER_TICK):
+        self.registry = registry
+        self.period = period
+        self.jitter = jitter
+        self.reviewing_period = reviewing_period
+        self.owns = owns
+        self.tick = tick
+        self._wheel = None
+        self._added = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return 0 if self._wheel is None else len(self._wheel)
+
+    def interval(self, subscription) -> float:
+        """Возвращает интервал до следующего опроса подписки."""
+        if subscription.status == 'reviewing':
+            interval = min(self.reviewing_period, self.period)
+        else:
+            backoff = 2 ** min(subscription.idle_polls, MAX_BACKOFF_STEPS)
+            interval = min(self.period * backoff, MAX_RETRY_PERIOD)
+        if self.jitter:
+            interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return interval
+
+    def schedule_new(self, now: float) -> None:
+        """Ставит в очередь подписки, которых в ней ещё нет.
+
+        Реестр обходится, только если в него добавлялись подписки.
+        """
+        with self._lock:
+            self._schedule_new(now)
+
+    def _schedule_new(self, now: float) -> None:
+        if self._wheel is None:
+            self._wheel = TimingWheel(now, self.tick)
+        if self.registry.added == self._added:
+            return
+        self._added = self.registry.added
+        new = [sub for sub in self.registry if sub.key not in self._wheel]
+        if not new:
+            return
+        slots = {}
+        for subscription in new:
+            slots.setdefault(subscription.token, len(slots))
+        step = self.period / len(slots)
+        for subscription in new:
+            self._wheel.add(
+                subscription.key, now + slots[subscription.token] * step
+            )
+
+    def cancel(self, key) -> None:
+        """Снимает подписку с очереди опросов."""
+        with self._lock:
+            if self._wheel is not None:
+                self._wheel.cancel(key)
+
+    def due(self, now: float) -> list:
+        """Извлекает из очереди подписки, время опроса которых пришло."""
+        with self._lock:
+            return self._due(now)
+
+    def _due(self, now: float) -> list:
+        if self._wheel is None:
+            return []
+        due = []
+        planned = {}
+        for due_at, key in self._wheel.advance(now):
+            subscription = self.registry.get(key)
+            if subscription is None:
+                continue
+            if self.owns is not None and not self.owns(subscription):
+                self._wheel.add(key, now + self.period)
+                continue
+            POLL_LAG_SECONDS.observe(now - due_at)
+            due.append(subscription)
+            flight = (subscription.token, subscription.timestamp)
+            if flight not in planned:
+                planned[flight] = now + self.interval(subscription)
+            self._wheel.add(key, planned[flight])
+        return due
+
+
+class Engine:
+    """Опрашивает API по всем подпискам реестра и уведомляет чаты.
+
+    Общие для всех подписок ресурсы - бот, HTTP-клиент, хранилище
+    состояния и очередь отправки - создаются один раз и передаются
+    в конструктор. Без очереди отправки сообщения отправляются сразу,
+    с очередью курсор и статусы подписки записываются в хранилище
+    только после доставки всех её сообщений.
+    Обновления статусов, присланные без опроса API, кладутся
+    в inbox и обрабатываются в цикле опроса. С shard опрашиваются
+    только подписки этого воркера.
+    """
+
+    def __init__(self, registry: SubscriptionRegistry, bot: telegram.Bot,
+                 client=None, store: StateStore = None,
+                 delivery: DeliveryQueue = None, period=RETRY_PERIOD,
+                 endpoint: str = ENDPOINT,
+                 reviewing_period=REVIEWING_PERIOD,
+                 spool: ingest.Spool = None, shard: Shard = None,
+                 renderer: MessageRenderer = None):
+        self.registry = registry
+        self.bot = bot
+        self.client = client
+        self.endpoint = endpoint
+        self.store = StateStore() if store is None else store
+        self.delivery = delivery
+        self.shard = shard
+        self.scheduler = Scheduler(
+            registry, period, reviewing_period=reviewing_period,
+            owns=None if shard is None else shard.owns,
+        )
+        self.flights = SingleFlight()
+        self.dedup = Deduplicator()
+        self.names = TTLCache(DEDUP_MAX_SIZE, DEDUP_STATUS_TTL)
+        self.inbox = queue.SimpleQueue()
+        self.spool = spool
+        self.renderer = MessageRenderer() if renderer is None else renderer
+        self.errors_count = 0
+        self._lock = threading.Lock()
+        self._owned = set()
+
+    def subscribe(self, token: str, chat_id):
+        """Подписывает чат на статусы домашек по токену с текущего момента."""
+        subscription = self.registry.add(token, chat_id, int(time.time()))
+        self.store.save_subscription(subscription)
+        logging.info('Новая подписка: %s', subscription)
+        return subscription
+
+    def unsubscribe(self, chat_id) -> int:
+        """Удаляет все подписки чата и возвращает их число.
+
+        Опрос удалённой подписки, который уже идёт, не запишет
+        её обратно в хранилище.
+        """
+        subscriptions = self.chat_subscriptions(chat_id)
+        for subscription in subscriptions:
+            with self._lock:
+                self.registry.remove(subscription.key)
+                self.store.remove_subscription(subscription.key)
+            self.scheduler.cancel(subscription.key)
+            self.forget_response(subscription)
+        return len(subscriptions)
+
+    def chat_subscriptions(self, chat_id) -> list:
+        """Подписки чата."""
+        return [
+            subscription for subscription in self.registry
+            if subscription.chat_id == str(chat_id)
+        ]
+
+    def homework_name(self, key) -> str:
+        """Название домашней работы из ответов API или её ключ.
+
+        Названия не сохраняются в хранилище: после перезапуска
+        название известно, когда работа снова придёт в ответе API.
+        """
+        with self._lock:
+            return self.names.get(key, key)
+
+    def statuses(self, subscription) -> dict:
+        """Коды последних известных статусов дз подписки.
+
+        Загружаются из хранилища лениво, при первом ответе API.
+        """
+        if subscription.statuses is None:
+            subscription.statuses = status_codes(
+                self.store.load_statuses(subscription.key)
+            )
+        return subscription.statuses
+
+    def process_response(self, subscription, response,
+                         move_cursor: bool = True) -> list:
+        """Разбирает ответ API и возвращает новые сообщения для чата.
+
+        Вместо ответа может быть передано исключение, возникшее
+        при запросе. Сообщение формируется только для домашних работ,
+        статус которых изменился; ошибка не повторяется дважды подряд
+        и не чаще раза в ERROR_SUPPRESSION_WINDOW секунд в одном чате,
+        даже если чередуется с другими ошибками. Об опросе, пропущенном
+        из-за открытого предохранителя API, чат не уведомляется.
+        В подписке хранится лишь текст последней ошибки до первого
+        успешного ответа, а не отправленные сообщения о статусах.
+        С очередью отправки сообщения должны быть переданы в notify:
+        статусы и курсор сохраняются после их доставки.
+        """
+        try:
+            if isinstance(response, Exception):
+                raise response
+            messages = self.status_messages(subscription, response)
+        except NoNewStatus as info:
+            logging.info('Статус дз: %s', info)
+            subscription.idle_polls += 1
+            subscription.last_message = ''
+            messages = []
+        except CircuitOpen as info:
+            logging.debug('Опрос пропущен: %s', info)
+            messages = []
+        except Exception as error:
+            messages = self.error_messages(subscription, error)
+        if move_cursor:
+            self.advance_cursor(subscription, response)
+        if self.delivery is not None:
+            with self._lock:
+                subscription.unsent += len(messages)
+        self.save(subscription)
+        return messages
+
+    def status_messages(self, subscription, response) -> list:
+        """Сообщения о домашних работах, статус которых изменился."""
+        homeworks = parse_response(response).homeworks
+        changes = changed_homeworks(homeworks, self.statuses(subscription))
+        with self._lock:
+            for homework in homeworks:
+                self.names.set(homework.key, homework.name)
+            subscription.unsaved.extend(
+                (homework.key, homework.status) for homework in changes
+            )
+        subscription.status = homeworks[0].status
+        subscription.idle_polls = (
+            0 if changes else subscription.idle_polls + 1
+        )
+        subscription.last_message = ''
+        return [
+            self.renderer.status(homework) for homework in changes
+            if self.dedup.status_is_new(
+                subscription.chat_id, homework.key, homework.code
+            )
+        ]
+
+    def error_messages(self, subscription, error: Exception) -> list:
+        """Сообщение об ошибке, если чат ещё не знает о ней."""
+        logging.error('Сбой: %s', error)
+        self.errors_count += 1
+        text = f'{error}'
+        repeated = text == subscription.last_message
+        subscription.last_message = text
+        if repeated or not self.dedup.error_is_new(
+                subscription.chat_id, text):
+            return []
+        return [self.renderer.error(text)]
+
+    def advance_cursor(self, subscription, response) -> None:
+        """Сдвигает курсор подписки на current_date из ответа API."""
+        if isinstance(response, dict) and response.get('current_date'):
+            subscription.timestamp = response.get('current_date')
+        elif isinstance(response, NotModified) and response.current_date:
+            subscription.timestamp = response.current_date
+
+    def save(self, subscription) -> None:
+        """Записывает курсор и новые статусы подписки в хранилище.
+
+        Пока сообщения подписки ждут в очереди отправки, запись
+        откладывается: после перезапуска опрос пойдёт от прежнего
+        курсора и недоставленные сообщения будут отправлены снова.
+        """
+        with self._lock:
+            if subscription.unsent:
+                return
+            if self.registry.get(subscription.key) is not subscription:
+                return
+            unsaved, subscription.unsaved = subscription.unsaved, []
+            subscription.saved_timestamp = subscription.timestamp
+            for key, status in unsaved:
+                self.store.save_status(subscription.key, key, status)
+            self.store.save_subscription(subscription)
+
+    def delivered(self, subscription, sent: bool) -> None:
+        """Учитывает доставку сообщения подписки из очереди отправки.
+
+        Если сообщение отброшено, несохранённые статусы забываются,
+        а курсор возвращается к сохранённому, и следующий опрос
+        уведомит чат о них снова.
+        """
+        with self._lock:
+            subscription.unsent -= 1
+            if not sent:
+                for key, _ in subscription.unsaved:
+                    self.dedup.forget(subscription.chat_id, key)
+                subscription.unsaved = []
+                subscription.statuses = None
+                subscription.timestamp = subscription.saved_timestamp
+        if not sent:
+            self.forget_response(subscription)
+        self.save(subscription)
+
+    def forget_response(self, subscription) -> None:
+        """Забывает прошлый ответ API подписки в HTTP-клиенте.
+
+        Иначе повторный запрос от того же курсора вернёт тот же
+        ответ, и клиент пропустит его как неизменившийся.
+        """
+        if isinstance(self.client, PracticumClient):
+            self.client.forget(subscription.key)
+
+    def notify(self, subscription, messages: list) -> None:
+        """Отправляет сообщения в чат подписки."""
+        on_done = functools.partial(self.delivered, subscription)
+        for message in messages:
+            if self.delivery is not None:
+                self.delivery.put(subscription.chat_id, message, on_done)
+            else:
+                send_message_to_chat(
+                    self.bot, subscription.chat_id, message,
+                    self.renderer.parse_mode,
+                )
+
+    def fetch(self, subscription) -> dict:
+        """Запрашивает статусы домашек подписки от её курсора.
+
+        Одновременные опросы с одним токеном и курсором, например
+        студента и наставника, выполняют один запрос и получают
+        один и тот же декодированный ответ.
+        """
+        return self.flights.do(
+            (subscription.token, subscription.timestamp),
+            self.request, subscription,
+        )
+
+    def request(self, subscription) -> dict:
+        """Выполняет запрос статусов домашек подписки.
+
+        Общий HTTP-клиент пропускает ответы, не изменившиеся
+        с прошлого опроса подписки, вызывая NotModified.
+        """
+        headers = make_headers(subscription.token)
+        if isinstance(self.client, PracticumClient):
+            return self.client.get_statuses(
+                headers, subscription.timestamp, subscription.key,
+                self.endpoint,
+            )
+        return request_homework_statuses(
+            headers, subscription.timestamp, self.client, self.endpoint
+        )
+
+    def poll(self, subscription) -> None:
+        """Опрашивает API по одной подписке и уведомляет её чат."""
+        try:
+            response = self.fetch(subscription)
+        except Exception as error:
+            response = error
+        messages = self.process_response(subscription, response)
+        self.notify(subscription, messages)
+
+    async def poll_async(self, subscription) -> None:
+        """Асинхронно опрашивает API по подписке и уведомляет её чат."""
+        try:
+            response = await aio.run_blocking(self.fetch, subscription)
+        except Exception as error:
+            response = error
+        messages = self.process_response(subscription, response)
+        if self.delivery is not None:
+            self.notify(subscription, messages)
+            return
+        for message in messages:
+            await aio.send_message(
+                self.bot, subscription.chat_id, message,
+                self.renderer.parse_mode,
+            )
+
+    def ingest_pending(self) -> int:
+        """Обрабатывает присланные обновления и уведомляет чаты.
+
+        Обновление с токеном применяется ко всем подпискам токена.
+        """
+        if self.spool is not None:
+            self.spool.read(self.inbox)
+        applied = 0
+        while True:
+            try:
+                token, response = self.inbox.get_nowait()
+            except queue.Empty:
+                return applied
+            for subscription in self.registry.by_token(token):
+                messages = self.process_response(
+                    subscription, response, move_cursor=False
+                )
+                self.notify(subscription, messages)
+                applied += 1
+
+    def run_pending(self, now: float = None) -> int:
+        """Опрашивает все подписки, время которых пришло."""
+        self.ingest_pending()
+        now = time.time() if now is None else now
+        self.scheduler.schedule_new(now)
+        due = self.scheduler.due(now)
+        for subscription in due:
+            self.poll(subscription)
+        self.store.flush()
+        return len(due)
+
+    async def poll_once(self) -> int:
+        """Опрашивает каждую подписку один раз и возвращает их число.
+
+        Для запуска по расписанию: опрос идёт от курсоров из хранилища,
+        новые курсоры и статусы записываются в него до возврата.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_POLLS)
+
+        async def poll(subscription):
+            async with semaphore:
+                await self.poll_async(subscription)
+
+        subscriptions = list(self.registry)
+        await asyncio.gather(*map(poll, subscriptions))
+        self.store.flush()
+        return len(subscriptions)
+
+    def backfill_token(self, token: str,
+                       batch_size: int = STATE_FLUSH_BATCH) -> int:
+        """Загружает всю историю статусов токена без уведомлений.
+
+        Запрос с from_date=0 выполняется один раз на токен, ответ
+        разбирается потоком по одной работе, а статусы записываются
+        как уже отправленные пачками по batch_size сразу для всех
+        подписок токена. Курсоры подписок не меняются, но сохраняются,
+        чтобы следующий опрос шёл от них. Возвращает число работ.
+        """
+        subscriptions = self.registry.by_token(token)
+        keys = [subscription.key for subscription in subscriptions]
+        for subscription in subscriptions:
+            self.store.save_subscription(subscription)
+            subscription.statuses = None
+        chunks = backfill.request_chunks(
+            self.client, make_headers(token), 0, self.endpoint
+        )
+        loaded = 0
+        batch = []
+        for item in backfill.iter_homeworks(chunks):
+            homework = make_homework(item)
+            batch.append((homework.key, homework.status))
+            if len(batch) >= batch_size:
+                self.store.save_statuses(keys, batch)
+                loaded += len(batch)
+                batch = []
+        if batch:
+            self.store.save_statuses(keys, batch)
+        return loaded + len(batch)
+
+    def rebalance(self) -> None:
+        """Подхватывает подписки после смены состава воркеров.
+
+        Своё состояние записывается в общее хранилище для нового
+        владельца. Курсор, последняя ошибка и статусы подписок,
+        перешедших к этому воркеру, перечитываются из хранилища, куда
+        их записал прежний владелец. Общий лимит отправки делится
+        между воркерами.
+        """
+        self.store.flush()
+        owned = set()
+        for token, chat_id, cursor, last_message in (
+                self.store.load_subscriptions()):
+            subscription = self.registry.add(token, chat_id, cursor)
+            if not self.shard.owns(subscription):
+                continue
+            owned.add(subscription.key)
+            if subscription.key not in self._owned:
+                subscription.timestamp = cursor
+                subscription.saved_timestamp = cursor
+                subscription.last_message = last_message
+                subscription.statuses = None
+                self.forget_response(subscription)
+        self._owned = owned
+        if self.delivery is not None:
+            rate = TELEGRAM_GLOBAL_RATE / max(len(self.shard.workers), 1)
+            self.delivery.bucket.rate = self.delivery.bucket.capacity = rate
+
+    async def run_forever(self, tick=SCHEDULER_TICK) -> None:
+        """Цикл событий: запускает опросы подписок конкурентно.
+
+        Число одновременных опросов ограничено MAX_CONCURRENT_POLLS,
+        подписка, опрос которой ещё не завершён, повторно не запускается.
+        Воркер с shard продлевает аренду раз в SHARD_HEARTBEAT секунд.
+        Накопленные курсоры и статусы записываются в хранилище раз
+        в STATE_FLUSH_INTERVAL секунд, не дожидаясь следующей записи.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_POLLS)
+        in_flight = set()
+        tasks = set()
+
+        async def poll(subscription):
+            try:
+                async with semaphore:
+                    await self.poll_async(subscription)
+            finally:
+                in_flight.discard(subscription.key)
+
+        stats_logged_at = heartbeat_at = flushed_at = time.time()
+        while True:
+            now = time.time()
+            if now - flushed_at >= STATE_FLUSH_INTERVAL:
+                flushed_at = now
+                self.store.flush()
+            if now - stats_logged_at >= RETRY_PERIOD:
+                stats_logged_at = now
+                self.log_stats()
+            if (self.shard is not None
+                    and now - heartbeat_at >= SHARD_HEARTBEAT):
+                heartbeat_at = now
+                if self.shard.refresh():
+                    self.rebalance()
+            self.ingest_pending()
+            self.scheduler.schedule_new(now)
+            for subscription in self.scheduler.due(now):
+                if subscription.key in in_flight:
+                    continue
+                in_flight.add(subscription.key)
+                task = asyncio.ensure_future(poll(subscription))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.sleep(tick)
+
+    def log_stats(self) -> None:
+        """Пишет в лог статистику HTTP-клиента."""
+        if isinstance(self.client, PracticumClient):
+            logging.info('Статистика HTTP-клиента: %s', self.client.stats())
+        logging.info(
+            'Объединено одновременных опросов: %s', self.flights.shared_count
+        )
+
+
+def load_registry(store: StateStore) -> SubscriptionRegistry:
+    """Загружает подписки из хранилища, файла и переменных окружения.
+
+    Для сохранённых подписок восстанавливаются курсор и последнее
+    отправленное сообщение, новые подписки начинаются с текущего времени.
+    """
+    timestamp = int(time.time())
+    registry = SubscriptionRegistry()
+    for token, chat_id, cursor, last_message in store.load_subscriptions():
+        registry.add(token, chat_id, cursor).last_message = last_message
+    registry.load_file(SUBSCRIPTIONS_PATH, timestamp)
+    if PRACTICUM_TOKEN and TELEGRAM_CHAT_ID:
+        registry.add(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, timestamp)
+    return registry
+
+
+async def run_until_terminated(engine: Engine) -> None:
+    """Запускает цикл опроса до сигнала SIGTERM.
+
+    SIGTERM, которым платформа останавливает процесс, отменяет цикл,
+    и serve успевает отправить сообщения из очереди и записать
+    состояние перед выходом.
+    """
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    try:
+        await engine.run_forever()
+    except asyncio.CancelledError:
+        logging.info('Получен SIGTERM, бот останавливается.')
+    finally:
+        loop.remove_signal_handler(signal.SIGTERM)
+
+
+def make_bot() -> telegram.Bot:
+    """Бот с пулом соединений на MAX_CONCURRENT_REQUESTS запросов."""
+    import telegram
+    from telegram.utils.request import Request
+
+    return telegram.Bot(
+        token=TELEGRAM_TOKEN,
+        request=Request(con_pool_size=MAX_CONCURRENT_REQUESTS),
+    )
+
+
+def make_renderer() -> MessageRenderer:
+    """Шаблоны из TEMPLATES_FILE в MESSAGE_LOCALE и MESSAGE_FORMAT."""
+    return MessageRenderer(load_templates(TEMPLATES_PATH), LOCALE, FORMAT)
+
+
+def open_shard(worker_id: str, store: StateStore) -> Shard:
+    """Аренда части подписок для воркера worker_id в базе STATE_DB."""
+    if not isinstance(store, SQLiteStateStore):
+        logging.critical('Воркерам нужна общая база состояния STATE_DB.')
+        sys.exit()
+    leases = LeaseTable(STATE_DB_PATH, journal_mode=STATE_DB_JOURNAL)
+    return Shard(worker_id, leases)
+
+
+def start_metrics(client: PracticumClient, index: int = 0) -> None:
+    """Публикует статистику клиента и, если задан порт, метрики по HTTP.
+
+    Воркер с номером index слушает порт METRICS_PORT + index.
+    """
+    for stat in client.stats():
+        HTTP_CLIENT.labels(stat).set_function(
+            lambda stat=stat: client.stats()[stat]
+        )
+    if METRICS_PORT_NUMBER:
+        metrics.start_http_server(METRICS_PORT_NUMBER + index)
+        logging.info(
+            'Метрики доступны на порту %s.', METRICS_PORT_NUMBER + index
+        )
+
+
+def open_spool(shard: Shard = None) -> ingest.Spool:
+    """Каталог INGEST_SPOOL для приёма обновлений или None."""
+    if shard is not None:
+        if INGEST_PORT_NUMBER or INGEST_SPOOL_PATH or WEBHOOK_URL:
+            logging.warning(
+                'Приём обновлений и команд в режиме воркеров '
+                'не поддерживается.'
+            )
+        return None
+    if not INGEST_SPOOL_PATH:
+        return None
+    import ingest
+
+    return ingest.Spool(INGEST_SPOOL_PATH)
+
+
+def polling_periods(shard: Shard = None, spool: ingest.Spool = None) -> tuple:
+    """Интервалы опроса (period, reviewing_period) для serve.
+
+    Если обновления присылаются без опроса, API опрашивается только
+    для сверки раз в RECONCILE_PERIOD.
+    """
+    if shard is None and (INGEST_PORT_NUMBER or spool is not None):
+        logging.info(
+            'Обновления принимаются без опроса, сверка с API раз в %s с.',
+            RECONCILE_PERIOD,
+        )
+        return RECONCILE_PERIOD, RECONCILE_PERIOD
+    return RETRY_PERIOD, REVIEWING_PERIOD
+
+
+def start_receivers(engine: Engine, bot: telegram.Bot):
+    """Запускает приём обновлений и вебхук команд, если они заданы.
+
+    Возвращает Updater вебхука или None.
+    """
+    if INGEST_PORT_NUMBER:
+        import ingest
+
+        ingest.start_ingest_server(
+            engine.inbox, INGEST_PORT_NUMBER, secret=INGEST_SECRET
+        )
+    if not WEBHOOK_URL:
+        return None
+    import commands
+
+    updater = commands.build_updater(engine, bot)
+    commands.start_webhook(
+        updater, WEBHOOK_URL, WEBHOOK_PORT_NUMBER, WEBHOOK_LISTEN,
+        WEBHOOK_URL_PATH,
+    )
+    return updater
+
+
+def serve(worker_id: str = '', index: int = 0) -> None:
+    """Опрашивает API по подпискам в текущем процессе.
+
+    С worker_id процесс работает воркером: опрашивает только свою часть
+    подписок и делит их с другими воркерами через таблицу аренды
+    в общей базе состояния и пишет логи в свой файл.
+    """
+    configure_logging(worker_log_file(worker_id) if worker_id else LOG_FILE)
+    if not TELEGRAM_TOKEN:
+        logging.critical('Токен телеграм-бота недоступен.')
+        sys.exit()
+
+    store = open_store(STATE_DB_PATH, STATE_DB_JOURNAL)
+    registry = load_registry(store)
+    if not registry and not WEBHOOK_URL:
+        logging.critical('Нет ни одной подписки.')
+        sys.exit()
+    logging.info('Загружено подписок: %s', len(registry))
+    shard = open_shard(worker_id, store) if worker_id else None
+
+    bot = make_bot()
+    client = PracticumClient(pool_size=MAX_CONCURRENT_REQUESTS)
+    start_metrics(client, index)
+    renderer = make_renderer()
+    delivery = DeliveryQueue(bot, parse_mode=renderer.parse_mode).start()
+    spool = open_spool(shard)
+    period, reviewing_period = polling_periods(shard, spool)
+    engine = Engine(registry, bot, client, store, delivery, period,
+                    reviewing_period=reviewing_period, spool=spool,
+                    shard=shard, renderer=renderer)
+    updater = None
+    if shard is not None:
+        engine.rebalance()
+    else:
+        updater = start_receivers(engine, bot)
+    try:
+        asyncio.run(run_until_terminated(engine))
+    finally:
+        if updater is not None:
+            updater.stop()
+        delivery.stop(timeout=DELIVERY_STOP_TIMEOUT)
+        client.close()
+        store.close()
+        if shard is not None:
+            shard.close()
+
+
+def run_workers(workers: int) -> None:
+    """Запускает воркеры в отдельных процессах и ждёт их завершения."""
+    context = multiprocessing.get_context('spawn')
+    host = socket.gethostname()
+    processes = [
+        context.Process(
+            target=serve, args=(f'{host}-{index}', index),
+            name=f'worker-{index}',
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    logging.info('Запущено воркеров: %s', workers)
+    for process in processes:
+        process.join()
+
+
+def main():
+    """Опрашивает API по всем подпискам.
+
+    SHARD_WORKERS > 1 запускает столько процессов-воркеров на этой
+    машине; SHARD_ID делает процесс одним воркером, что позволяет
+    запускать воркеры на нескольких машинах с общей базой STATE_DB.
+    """
+    if SHARD_WORKERS_COUNT > 1:
+        configure_logging()
+        run_workers(SHARD_WORKERS_COUNT)
+    else:
+        serve(SHARD_ID)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,3 +2,21 @@ class NoNewStatus(Exception):
     """Вызывается, когда в ответе от API нет обновлений статуса дз."""
 
     pass
+
+
+class NotModified(NoNewStatus):
+    """Вызывается, когда ответ API не изменился с прошлого запроса."""
+
+    def __init__(self, current_date: int = None):
+        super().__init__('Ответ API не изменился с прошлого запроса.')
+        self.current_date = current_date
+
+
+class CircuitOpen(Exception):
+    """Вызывается, когда запросы к недоступному API приостановлены."""
+
+    def __init__(self, endpoint: str):
+        super().__init__(
+            f'API {endpoint} недоступен, запросы приостановлены.'
+        )
+        self.endpoint = endpoint
@@ -1,37 +1,28 @@
+from __future__ import annotations
+
+import functools
 import os
 import time
 import logging
 import sys
 from http import HTTPStatus
+from typing import TYPE_CHECKING
 
-import requests
-import telegram
 from dotenv import load_dotenv
 
-from settings import RETRY_PERIOD, HOMEWORK_VERDICTS, ENDPOINT
+from settings import RETRY_PERIOD, HOMEWORK_VERDICTS, ENDPOINT, LOG_FILE
 from exceptions import NoNewStatus
-
-
-log_format = (
-    '%(asctime)s, %(levelname)s, %(funcName)s, '
-    '%(lineno)d, %(message)s, %(name)s')
-
-formatter = logging.Formatter(
-    fmt=log_format,
-)
-
-console_logger = logging.StreamHandler()
-console_logger.setLevel(logging.INFO)
-
-file_logger = logging.FileHandler('logs.log')
-file_logger.setLevel(logging.DEBUG)
-
-logging.basicConfig(
-    handlers=(console_logger, file_logger),
-    format=log_format,
-    level=logging.DEBUG,
+from log_config import queue_handler
+from metrics import (
+    API_REQUEST_SECONDS, API_RESPONSES, CHECK_RESPONSE_FAILURES,
+    PARSE_STATUS_RESULTS, SEND_MESSAGE_FAILURES, SEND_MESSAGE_SECONDS,
+    count_exceptions,
 )
+from schema import validate_response
+from dedup import Deduplicator
 
+if TYPE_CHECKING:
+    import telegram
 
 load_dotenv()
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
@@ -41,32 +32,76 @@ TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
 
+@functools.lru_cache(maxsize=None)
+def configure_logging(path: str = LOG_FILE) -> None:
+    """Настраивает логи бота в файл path один раз за процесс.
+
+    Вызывается при запуске бота, а не при импорте модуля, поэтому
+    импорт не создаёт файл лога и поток записи логов.
+    """
+    logging.basicConfig(
+        handlers=(queue_handler(path),),
+        level=os.getenv('LOG_LEVEL', 'DEBUG'),
+    )
+
+
 def check_tokens():
     """Проверяет доступность токенов в виртуальном окружении."""
     return all([TELEGRAM_CHAT_ID, TELEGRAM_TOKEN, PRACTICUM_TOKEN])
 
 
+def make_headers(token: str) -> dict:
+    """Формирует заголовки запроса к API для токена Практикума."""
+    return {'Authorization': f'OAuth {token}'}
+
+
 def send_message(bot: telegram.Bot, message: str):
     """Отправляет сообщение от бота в чат."""
+    send_message_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_message_to_chat(bot: telegram.Bot, chat_id, message: str,
+                         parse_mode: str = None):
+    """Отправляет сообщение от бота в указанный чат."""
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
+        with SEND_MESSAGE_SECONDS.time():
+            bot.send_message(
+                chat_id=chat_id, text=message, parse_mode=parse_mode
+            )
         logging.debug('Бот отправил сообщение.')
     except Exception as error:
-        logging.error(f'{error}: ошибка при отправке сообщения ботом.')
+        SEND_MESSAGE_FAILURES.labels(type(error).__name__).inc()
+        logging.error('%s: ошибка при отправке сообщения ботом.', error)
 
 
 def get_api_answer(timestamp: int) -> dict:
     """Получает ответ от API яндекс.домашки в формате .json."""
+    return request_homework_statuses(HEADERS, timestamp)
+
+
+def request_homework_statuses(headers: dict, timestamp: int,
+                              client=None, endpoint=ENDPOINT) -> dict:
+    """Запрашивает статусы домашек от timestamp с заданными заголовками.
+
+    client - объект с методом get(): клиент с общим пулом соединений,
+    по умолчанию - модуль requests.
+    """
+    import requests
+
+    if client is None:
+        client = requests
     params = {'from_date': int(timestamp)}
     try:
-        response = requests.get(
-            url=ENDPOINT,
-            headers=HEADERS,
-            params=params,
-        )
+        with API_REQUEST_SECONDS.time():
+            response = client.get(
+                url=endpoint,
+                headers=headers,
+                params=params,
+            )
+        API_RESPONSES.labels(response.status_code).inc()
     except requests.RequestException as error:
         logging.error(
-            f'{error}: Что-то пошло не так при доступе к API яндекс.Домашки'
+            '%s: Что-то пошло не так при доступе к API яндекс.Домашки', error
         )
 
     if response.status_code != HTTPStatus.OK:
@@ -75,52 +110,38 @@ def get_api_answer(timestamp: int) -> dict:
             f'status_code {response.status_code}'
         )
     logging.info(
-        'Запрос от API яндекс.Домашки получен. '
-        f'status_code: {response.status_code}'
+        'Запрос от API яндекс.Домашки получен. status_code: %s',
+        response.status_code,
     )
 
     try:
         response = response.json()
     except Exception as error:
         logging.error(
-            f'{error}: Невалидный ответ от API: '
-            'ответ не может быть декодирован в .json.'
+            '%s: Невалидный ответ от API: '
+            'ответ не может быть декодирован в .json.', error
         )
 
     return response
 
 
+@count_exceptions(CHECK_RESPONSE_FAILURES, ignore=NoNewStatus)
 def check_response(response: dict) -> list:
-    """Получаем из ответа API яндекс.Домашки последнюю домашнюю работу."""
-    if type(response) != dict:
-        raise TypeError(
-            'Некорретный тип данных объекта response, '
-            'переданного в check_response.'
-        )
-    for key in ['homeworks', 'current_date']:
-        if key not in response:
-            raise KeyError(f'Нет ключа "{key}" в ответе от API.')
-
-    if type(response.get('homeworks')) != list:
-        raise TypeError('Некорректный тип данных объекта homeworks.')
-
-    if type(response.get('current_date')) != int:
-        raise TypeError('Некорректный тип данных обьекта current_date')
-
-    homeworks = response.get('homeworks')
+    """Получаем из ответа API яндекс.Домашки список домашних работ."""
+    homeworks, _ = validate_response(response)
 
     if not homeworks:
         raise NoNewStatus('В ответе от API нет новых статусов домашки.')
     logging.info(
-        'Из ответа API получен список ДЗ '
-        f'из {len(homeworks)} объектов.'
+        'Из ответа API получен список ДЗ из %s объектов.', len(homeworks)
     )
-    return homeworks[0]
+    return homeworks
 
 
 def parse_status(homework):
     """Получаем статус домашнего задания для сообщения бота."""
     if not homework.get('homework_name'):
+        PARSE_STATUS_RESULTS.labels('invalid').inc()
         logging.error('Нет ключа "homework_name" в словаре "homework".')
         raise KeyError('Нет ключа "homework_name" в словаре "homework".')
 
@@ -128,19 +149,48 @@ def parse_status(homework):
     status = homework.get('status')
 
     if status not in HOMEWORK_VERDICTS:
+        PARSE_STATUS_RESULTS.labels('unknown').inc()
         raise Exception(
             f'Неожиданный статус домашнего задания "{homework_name}". '
             'Статус отсутствует в словаре HOMEWORK_VERDICTS'
         )
     verdict = HOMEWORK_VERDICTS.get(status)
+    PARSE_STATUS_RESULTS.labels(status).inc()
     logging.info(
-        f'Получен статус {status} проверки работы : {homework_name}'
+        'Получен статус %s проверки работы : %s', status, homework_name
     )
     return f'Изменился статус проверки работы "{homework_name}". {verdict}'
 
 
+def homework_key(homework: dict) -> str:
+    """Ключ домашней работы: id, а если его нет - название."""
+    return str(homework.get('id', homework.get('homework_name')))
+
+
+def new_status_messages(homeworks: list, statuses: dict) -> list:
+    """Получаем сообщения о домашних работах с изменившимся статусом.
+
+    statuses - последние известные статусы по ключам домашних работ,
+    обновляется только если все работы из списка корректны.
+    Возвращает список (ключ, статус, сообщение) от старых работ к новым.
+    """
+    changes = []
+    for homework in reversed(homeworks):
+        message = parse_status(homework)
+        key = homework_key(homework)
+        status = homework.get('status')
+        if statuses.get(key) != status:
+            changes.append((key, status, message))
+    for key, status, _ in changes:
+        statuses[key] = status
+    return changes
+
+
 def main():
     """Основная логика работы бота."""
+    import telegram
+
+    configure_logging()
     if check_tokens():
         logging.info('Все токены загружены в виртуальное окружение.')
     else:
@@ -148,24 +198,29 @@ def main():
         sys.exit()
 
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    cached_message = ''
+    dedup = Deduplicator()
+    statuses = {}
     ya_api_response = ''
     timestamp = int(time.time())
 
     while True:
+        messages = []
         try:
             ya_api_response = get_api_answer(timestamp)
-            last_homework = check_response(ya_api_response)
-            message = parse_status(last_homework)
+            homeworks = check_response(ya_api_response)
+            messages = [
+                message for key, status, message
+                in new_status_messages(homeworks, statuses)
+                if dedup.status_is_new(TELEGRAM_CHAT_ID, key, status)
+            ]
         except NoNewStatus as info:
-            logging.info(f'Статус дз: {info}')
-            message = cached_message
+            logging.info('Статус дз: %s', info)
         except Exception as error:
-            logging.error(f'Сбой: {error}')
-            message = f'{error}'
+            logging.error('Сбой: %s', error)
+            if dedup.error_is_new(TELEGRAM_CHAT_ID, f'{error}'):
+                messages = [f'{error}']
         finally:
-            if message != cached_message:
-                cached_message = message
+            for message in messages:
                 send_message(bot, message)
             if ya_api_response:
                 timestamp = ya_api_response.get('current_date')
@@ -173,4 +228,8 @@ def main():
 
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        from cli import run
+
+        sys.exit(run(sys.argv[1:]))
     main()
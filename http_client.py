@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+from circuit_breaker import CircuitBreaker
+from exceptions import CircuitOpen, NotModified
+from metrics import API_REQUEST_SECONDS, API_RESPONSES
+from settings import ENDPOINT, HTTP_POOL_SIZE, HTTP_TIMEOUT
+
+if TYPE_CHECKING:
+    import requests
+
+CURRENT_DATE_PATTERN = re.compile(rb'"current_date"\s*:\s*(\d+)')
+
+
+class PracticumClient:
+    """HTTP-клиент с общим пулом keep-alive соединений.
+
+    Один клиент используется всеми подписками, поэтому DNS-запрос,
+    TCP- и TLS-рукопожатие выполняются один раз на соединение пула,
+    а не на каждый запрос к API.
+    """
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE,
+                 timeout: float = HTTP_TIMEOUT):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True,
+        )
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self._lock = threading.Lock()
+        self._validators = {}
+        self._breakers = {}
+        self.requests_count = 0
+        self.cache_hits = 0
+        self.not_modified_count = 0
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Выполняет GET-запрос через пул соединений."""
+        kwargs.setdefault('timeout', self.timeout)
+        with self._lock:
+            self.requests_count += 1
+        return self.session.get(url, **kwargs)
+
+    @property
+    def connections_count(self) -> int:
+        """Число установленных соединений (рукопожатий) за время работы."""
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """Общий для всех подписок предохранитель адреса API."""
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(endpoint)
+            return self._breakers[endpoint]
+
+    def get_statuses(self, headers: dict, timestamp: int, cache_key,
+                     endpoint: str = ENDPOINT) -> dict:
+        """Запрашивает статусы домашек, пропуская неизменившиеся ответы.
+
+        Запрос отправляется с If-None-Match/If-Modified-Since из прошлого
+        ответа для cache_key. Если сервер ответил 304 или тело ответа
+        без поля current_date совпало с прошлым, вызывается NotModified:
+        тело не декодируется и не проверяется повторно.
+
+        Пока предохранитель адреса открыт после ошибок сети или 5xx,
+        запрос не отправляется и вызывается CircuitOpen.
+        """
+        import requests
+
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpen(endpoint)
+        etag, last_modified, digest = self._validators.get(
+            cache_key, (None, None, None)
+        )
+        request_headers = dict(headers)
+        if etag:
+            request_headers['If-None-Match'] = etag
+        if last_modified:
+            request_headers['If-Modified-Since'] = last_modified
+        try:
+            with API_REQUEST_SECONDS.time():
+                response = self.get(
+                    endpoint,
+                    headers=request_headers,
+                    params={'from_date': int(timestamp)},
+                )
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        API_RESPONSES.labels(response.status_code).inc()
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            self._count('not_modified_count')
+            raise NotModified()
+        if response.status_code != HTTPStatus.OK:
+            raise Exception(
+                'Ошибка при доступе к API яндекс.Домашки. '
+                f'status_code {response.status_code}'
+            )
+
+        body = response.content
+        match = CURRENT_DATE_PATTERN.search(body)
+        new_digest = hashlib.blake2b(
+            CURRENT_DATE_PATTERN.sub(b'', body, count=1), digest_size=16
+        ).digest()
+        self._validators[cache_key] = (
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified'),
+            new_digest,
+        )
+        if match and new_digest == digest:
+            self._count('cache_hits')
+            raise NotModified(int(match[1]))
+        return response.json()
+
+    def forget(self, cache_key) -> None:
+        """Удаляет сохранённые валидаторы ответа для ключа."""
+        self._validators.pop(cache_key, None)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        """Возвращает счётчики запросов, рукопожатий и попаданий в кэш."""
+        skipped = self.cache_hits + self.not_modified_count
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {
+            'requests': self.requests_count,
+            'connections': self.connections_count,
+            'cache_hits': self.cache_hits,
+            'not_modified': self.not_modified_count,
+            'hit_ratio': (
+                skipped / self.requests_count if self.requests_count else 0
+            ),
+            'circuit_rejected': sum(
+                breaker.rejected_count for breaker in breakers
+            ),
+        }
+
+    def close(self) -> None:
+        """Закрывает все соединения пула."""
+        self.session.close()
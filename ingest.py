@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import queue
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metrics import PUSHED_UPDATES
+from schema import parse_response
+
+PUSH_PATH = '/push'
+
+
+def read_update(data: bytes) -> tuple:
+    """Проверяет присланное обновление и возвращает (токен, ответ).
+
+    Обновление - JSON вида {"token": ..., "homeworks": [...]},
+    домашние работы в том же формате, что и в ответе API.
+    Если current_date не передан, он считается равным 0.
+    """
+    update = json.loads(data)
+    if type(update) is not dict:
+        raise TypeError('Обновление должно быть объектом JSON.')
+    token = update.pop('token', None)
+    if not token or type(token) is not str:
+        raise KeyError('Нет ключа "token" в обновлении.')
+    update.setdefault('current_date', 0)
+    parse_response(update)
+    return token, update
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов с обновлениями статусов к PUSH_PATH."""
+
+    def do_POST(self):
+        """Проверяет обновление и кладёт его в inbox сервера.
+
+        Отвечает 202, если обновление принято, 400 - если оно
+        некорректно, и 403 - если не передан секрет сервера.
+        """
+        if self.path.split('?')[0] != PUSH_PATH:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        secret = self.server.secret
+        if secret and self.headers.get('X-Ingest-Secret') != secret:
+            PUSHED_UPDATES.labels('forbidden').inc()
+            self.send_error(HTTPStatus.FORBIDDEN)
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            update = read_update(self.rfile.read(length))
+        except Exception as error:
+            PUSHED_UPDATES.labels('invalid').inc()
+            logging.warning('Некорректное обновление: %s', error)
+            self.send_error(HTTPStatus.BAD_REQUEST, explain=str(error))
+            return
+        PUSHED_UPDATES.labels('accepted').inc()
+        self.server.inbox.put(update)
+        self.send_response(HTTPStatus.ACCEPTED)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        """Не пишет каждый запрос в stderr."""
+
+
+def start_ingest_server(inbox: queue.SimpleQueue, port: int,
+                        addr: str = '127.0.0.1', secret: str = ''):
+    """Принимает обновления статусов по адресу http://addr:port/push.
+
+    Проверенные обновления кладутся в inbox. Если задан secret,
+    запрос должен передать его в заголовке X-Ingest-Secret.
+    """
+    server = ThreadingHTTPServer((addr, port), IngestHandler)
+    server.daemon_threads = True
+    server.inbox = inbox
+    server.secret = secret
+    threading.Thread(
+        target=server.serve_forever, name='ingest', daemon=True
+    ).start()
+    return server
+
+
+class Spool:
+    """Каталог, в который другие процессы кладут обновления.
+
+    Каждое обновление - отдельный файл *.json; писать его нужно
+    под другим именем и затем переименовывать, чтобы файл не был
+    прочитан недописанным. Прочитанные файлы удаляются,
+    некорректные переименовываются в *.bad.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def read(self, inbox: queue.SimpleQueue) -> int:
+        """Перекладывает обновления из каталога в inbox."""
+        read = 0
+        for name in sorted(os.listdir(self.path)):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.path, name)
+            try:
+                with open(path, 'rb') as file:
+                    update = read_update(file.read())
+            except Exception as error:
+                PUSHED_UPDATES.labels('invalid').inc()
+                logging.warning('Некорректное обновление %s: %s', name, error)
+                os.replace(path, path[:-len('.json')] + '.bad')
+                continue
+            os.remove(path)
+            PUSHED_UPDATES.labels('accepted').inc()
+            inbox.put(update)
+            read += 1
+        return read
@@ -0,0 +1,94 @@
+import atexit
+import json
+import logging
+import os
+import queue
+from logging.handlers import (
+    QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler,
+)
+
+from settings import (
+    LOG_BACKUP_COUNT, LOG_FILE, LOG_FORMAT, LOG_MAX_BYTES, LOG_ROTATE_WHEN,
+)
+
+
+class JSONFormatter(logging.Formatter):
+    """Форматирует запись лога в одну строку JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Строка JSON с временем, уровнем, местом и текстом записи."""
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'func': record.funcName,
+            'line': record.lineno,
+            'message': record.getMessage(),
+            'logger': record.name,
+        }
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+def file_handler(path: str) -> logging.Handler:
+    """Файловый обработчик с ротацией по размеру или по времени."""
+    when = os.getenv('LOG_ROTATE_WHEN', LOG_ROTATE_WHEN)
+    if when:
+        return TimedRotatingFileHandler(
+            path, when=when, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+    return RotatingFileHandler(
+        path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+        encoding='utf-8',
+    )
+
+
+def worker_log_file(worker_id: str, path: str = LOG_FILE) -> str:
+    """Файл лога воркера: logs.log -> logs-<worker_id>.log.
+
+    Ротация файла несколькими процессами теряет и портит записи,
+    поэтому каждый воркер пишет в свой файл.
+    """
+    root, ext = os.path.splitext(path)
+    return f'{root}-{worker_id}{ext}'
+
+
+def stop_listener(listener: QueueListener) -> None:
+    """Дописывает оставшиеся записи и останавливает поток записи логов."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def queue_handler(path: str = LOG_FILE) -> QueueHandler:
+    """Обработчик, передающий записи в фоновый поток записи логов.
+
+    Запись в консоль (INFO) и в файл с ротацией (DEBUG) выполняет
+    QueueListener в отдельном потоке, поэтому ввод-вывод логов
+    не задерживает опрос API. При LOG_FORMAT=json записи пишутся
+    в формате JSON.
+    """
+    if os.getenv('LOG_FORMAT', LOG_FORMAT) == 'json':
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s, %(levelname)s, %(funcName)s, '
+            '%(lineno)d, %(message)s, %(name)s'
+        )
+
+    console_logger = logging.StreamHandler()
+    console_logger.setLevel(logging.INFO)
+    file_logger = file_handler(path)
+    file_logger.setLevel(logging.DEBUG)
+    for handler in (console_logger, file_logger):
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    listener = QueueListener(
+        records, console_logger, file_logger, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(stop_listener, listener)
+    handler = QueueHandler(records)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    handler.listener = listener
+    return handler
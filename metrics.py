@@ -0,0 +1,288 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+    300, 600, float('inf'),
+)
+
+REGISTRY = []
+
+
+class Metric:
+    """Метрика в формате Prometheus с необязательными метками."""
+
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=(),
+                 registry: list = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        if registry is not None:
+            registry.append(self)
+
+    def labels(self, *values) -> 'BoundMetric':
+        """Метрика с конкретными значениями меток."""
+        return BoundMetric(self, tuple(str(value) for value in values))
+
+    def _label_text(self, values: tuple, extra: dict = None) -> str:
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.extend(extra.items())
+        if not pairs:
+            return ''
+        return '{' + ','.join(
+            f'{name}="{value}"' for name, value in pairs
+        ) + '}'
+
+    def samples(self) -> list:
+        """Строки с текущими значениями метрики."""
+        with self._lock:
+            return [
+                f'{self.name}{self._label_text(labels)} {value}'
+                for labels, value in self._values.items()
+            ]
+
+    def render(self) -> str:
+        """Метрика в текстовом формате Prometheus."""
+        return '\n'.join([
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+            *self.samples(),
+        ])
+
+
+class BoundMetric:
+    """Метрика с заданными значениями меток."""
+
+    __slots__ = ('metric', 'values')
+
+    def __init__(self, metric: Metric, values: tuple):
+        self.metric = metric
+        self.values = values
+
+    def __getattr__(self, name):
+        method = getattr(self.metric, name)
+        return lambda *args, **kwargs: method(
+            *args, _labels=self.values, **kwargs
+        )
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, _labels: tuple = ()) -> None:
+        """Увеличивает счётчик."""
+        with self._lock:
+            self._values[_labels] = self._values.get(_labels, 0) + amount
+
+    def value(self, _labels: tuple = ()) -> float:
+        """Текущее значение счётчика."""
+        return self._values.get(_labels, 0)
+
+
+class Gauge(Metric):
+    """Значение, которое может расти и уменьшаться."""
+
+    kind = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._functions = {}
+
+    def set(self, value: float, _labels: tuple = ()) -> None:
+        """Устанавливает значение."""
+        with self._lock:
+            self._values[_labels] = value
+
+    def set_function(self, function, _labels: tuple = ()) -> None:
+        """Значение будет вычисляться функцией при каждом чтении."""
+        with self._lock:
+            self._functions[_labels] = function
+
+    def samples(self) -> list:
+        """Строки со значениями, вычисленными функциями при чтении."""
+        for labels, function in list(self._functions.items()):
+            self.set(function(), labels)
+        return super().samples()
+
+
+class Histogram(Metric):
+    """Распределение значений по корзинам."""
+
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != float('inf'):
+            self.buckets += (float('inf'),)
+
+    def observe(self, value: float, _labels: tuple = ()) -> None:
+        """Учитывает значение."""
+        with self._lock:
+            counts, total = self._values.get(
+                _labels, ([0] * len(self.buckets), 0)
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._values[_labels] = (counts, total + value)
+
+    @contextmanager
+    def time(self, _labels: tuple = ()):
+        """Учитывает время выполнения блока with."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, _labels)
+
+    def count(self, _labels: tuple = ()) -> int:
+        """Число учтённых значений."""
+        counts, _ = self._values.get(_labels, ([0], 0))
+        return counts[-1]
+
+    def samples(self) -> list:
+        """Строки корзин, суммы и числа значений гистограммы."""
+        lines = []
+        with self._lock:
+            for labels, (counts, total) in self._values.items():
+                for bound, count in zip(self.buckets, counts):
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(
+                        f'{self.name}_bucket'
+                        f'{self._label_text(labels, {"le": le})} {count}'
+                    )
+                lines.append(
+                    f'{self.name}_sum{self._label_text(labels)} {total}'
+                )
+                lines.append(
+                    f'{self.name}_count{self._label_text(labels)} '
+                    f'{counts[-1]}'
+                )
+        return lines
+
+
+def count_exceptions(counter: Counter, ignore: tuple = ()):
+    """Декоратор: считает исключения функции по имени их класса."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except ignore:
+                raise
+            except Exception as error:
+                counter.labels(type(error).__name__).inc()
+                raise
+        return wrapper
+    return decorator
+
+
+def render(registry: list = REGISTRY) -> str:
+    """Все метрики реестра в текстовом формате Prometheus."""
+    return '\n'.join(metric.render() for metric in registry) + '\n'
+
+
+@functools.lru_cache(maxsize=None)
+def metrics_handler():
+    """Обработчик /metrics, создаётся при запуске сервера метрик."""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Отдаёт метрики в текстовом формате Prometheus."""
+
+        def do_GET(self):
+            """Отвечает метриками на GET /metrics."""
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            """Не пишет каждый запрос в stderr."""
+
+    return MetricsHandler
+
+
+def start_http_server(port: int, addr: str = '127.0.0.1'):
+    """Отдаёт метрики по адресу http://addr:port/metrics."""
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((addr, port), metrics_handler())
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name='metrics', daemon=True
+    ).start()
+    return server
+
+
+API_REQUEST_SECONDS = Histogram(
+    'homework_api_request_seconds',
+    'Длительность запроса к API яндекс.Домашки.',
+)
+API_RESPONSES = Counter(
+    'homework_api_responses_total',
+    'Ответы API яндекс.Домашки по коду ответа.',
+    ['status_code'],
+)
+CHECK_RESPONSE_FAILURES = Counter(
+    'homework_check_response_failures_total',
+    'Ответы API, не прошедшие проверку check_response.',
+    ['error'],
+)
+PARSE_STATUS_RESULTS = Counter(
+    'homework_parse_status_total',
+    'Результаты parse_status по статусу домашки.',
+    ['status'],
+)
+SEND_MESSAGE_SECONDS = Histogram(
+    'homework_send_message_seconds',
+    'Длительность отправки сообщения в Telegram.',
+)
+SEND_MESSAGE_FAILURES = Counter(
+    'homework_send_message_failures_total',
+    'Ошибки отправки сообщений в Telegram.',
+    ['error'],
+)
+POLL_LAG_SECONDS = Histogram(
+    'homework_poll_lag_seconds',
+    'Опоздание опроса подписки относительно запланированного времени.',
+)
+HTTP_CLIENT = Gauge(
+    'homework_http_client',
+    'Счётчики общего HTTP-клиента: запросы, соединения, попадания в кэш.',
+    ['stat'],
+)
+CIRCUIT_BREAKER_STATE = Gauge(
+    'homework_circuit_breaker_state',
+    'Состояние предохранителя API: 0 - закрыт, 1 - открыт, 2 - проба.',
+    ['endpoint'],
+)
+COALESCED_REQUESTS = Counter(
+    'homework_coalesced_requests_total',
+    'Опросы, получившие ответ одновременного запроса с тем же токеном.',
+)
+PUSHED_UPDATES = Counter(
+    'homework_pushed_updates_total',
+    'Обновления статусов, полученные без опроса API, по результату.',
+    ['result'],
+)
+SUPPRESSED_MESSAGES = Counter(
+    'homework_suppressed_messages_total',
+    'Повторные уведомления, не отправленные в чат.',
+    ['kind'],
+)
@@ -0,0 +1,162 @@
+from operator import itemgetter
+
+from exceptions import NoNewStatus
+from metrics import (
+    CHECK_RESPONSE_FAILURES, PARSE_STATUS_RESULTS, count_exceptions,
+)
+from settings import HOMEWORK_VERDICTS
+
+RESPONSE_SCHEMA = (
+    ('homeworks', list, 'Некорректный тип данных объекта homeworks.'),
+    ('current_date', int, 'Некорректный тип данных обьекта current_date'),
+)
+STATUSES = tuple(HOMEWORK_VERDICTS)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+VERDICTS = tuple(HOMEWORK_VERDICTS.values())
+
+
+class Homework:
+    """Домашняя работа из ответа API: только нужные боту поля.
+
+    Статус хранится кодом - индексом в HOMEWORK_VERDICTS, поэтому
+    строки статусов общие для всех работ, а сообщение формируется
+    только при обращении.
+    """
+
+    __slots__ = ('id', 'name', 'code', 'comment')
+
+    def __init__(self, id, name: str, code: int, comment: str = ''):
+        self.id = id
+        self.name = name
+        self.code = code
+        self.comment = comment
+
+    @property
+    def status(self) -> str:
+        """Статус работы из HOMEWORK_VERDICTS."""
+        return STATUSES[self.code]
+
+    @property
+    def key(self) -> str:
+        """Ключ домашней работы: id, а если его нет - название."""
+        return str(self.name if self.id is None else self.id)
+
+    @property
+    def message(self) -> str:
+        """Сообщение об изменении статуса работы."""
+        return (
+            f'Изменился статус проверки работы "{self.name}". '
+            f'{VERDICTS[self.code]}'
+        )
+
+
+class StatusesResponse:
+    """Проверенный ответ API: домашние работы и время ответа."""
+
+    __slots__ = ('homeworks', 'current_date')
+
+    def __init__(self, homeworks: list, current_date: int):
+        self.homeworks = homeworks
+        self.current_date = current_date
+
+
+def compile_schema(schema: tuple):
+    """Собирает проверку словаря по схеме ((ключ, тип, ошибка), ...).
+
+    Значения всех ключей извлекаются одним вызовом itemgetter,
+    проверка возвращает их кортежем в порядке схемы.
+    """
+    keys = tuple(key for key, _, _ in schema)
+    getter = itemgetter(*keys)
+    single = len(keys) == 1
+    types = tuple((kind, message) for _, kind, message in schema)
+
+    def validate(data) -> tuple:
+        if type(data) is not dict:
+            raise TypeError(
+                'Некорретный тип данных объекта response, '
+                'переданного в check_response.'
+            )
+        try:
+            values = getter(data)
+        except KeyError:
+            missing = next(key for key in keys if key not in data)
+            raise KeyError(
+                f'Нет ключа "{missing}" в ответе от API.'
+            ) from None
+        if single:
+            values = (values,)
+        for value, (kind, message) in zip(values, types):
+            if type(value) is not kind:
+                raise TypeError(message)
+        return values
+
+    return validate
+
+
+validate_response = compile_schema(RESPONSE_SCHEMA)
+
+
+def make_homework(item: dict) -> Homework:
+    """Проверяет домашнюю работу из ответа API и создаёт Homework."""
+    if type(item) is not dict:
+        raise TypeError('Некорректный тип данных домашней работы.')
+    name = item.get('homework_name')
+    if not name:
+        PARSE_STATUS_RESULTS.labels('invalid').inc()
+        raise KeyError('Нет ключа "homework_name" в словаре "homework".')
+    code = STATUS_CODES.get(item.get('status'))
+    if code is None:
+        PARSE_STATUS_RESULTS.labels('unknown').inc()
+        raise Exception(
+            f'Неожиданный статус домашнего задания "{name}". '
+            'Статус отсутствует в словаре HOMEWORK_VERDICTS'
+        )
+    return Homework(
+        item.get('id'), name, code, item.get('reviewer_comment') or ''
+    )
+
+
+@count_exceptions(CHECK_RESPONSE_FAILURES, ignore=NoNewStatus)
+def parse_response(response: dict) -> StatusesResponse:
+    """Проверяет ответ API и все домашние работы в нём за один проход.
+
+    Ошибки те же, что у check_response и parse_status,
+    но результат - объекты Homework вместо словарей. Метрика
+    статусов увеличивается один раз на статус, а не на каждую работу.
+    """
+    homeworks, current_date = validate_response(response)
+    if not homeworks:
+        raise NoNewStatus('В ответе от API нет новых статусов домашки.')
+    homeworks = [make_homework(item) for item in homeworks]
+    counts = [0] * len(STATUSES)
+    for homework in homeworks:
+        counts[homework.code] += 1
+    for code, count in enumerate(counts):
+        if count:
+            PARSE_STATUS_RESULTS.labels(STATUSES[code]).inc(count)
+    return StatusesResponse(homeworks, current_date)
+
+
+def status_codes(statuses: dict) -> dict:
+    """Переводит статусы дз {ключ: статус} в {ключ: код статуса}."""
+    return {
+        key: STATUS_CODES[status]
+        for key, status in statuses.items()
+        if status in STATUS_CODES
+    }
+
+
+def changed_homeworks(homeworks: list, codes: dict) -> list:
+    """Домашние работы с изменившимся статусом, от старых к новым.
+
+    codes - коды последних известных статусов по ключам домашних
+    работ, в него записываются новые коды.
+    """
+    changes = [
+        homework for homework in reversed(homeworks)
+        if codes.get(homework.key) != homework.code
+    ]
+    for homework in changes:
+        codes[homework.key] = homework.code
+    return changes
@@ -7,3 +7,95 @@ HOMEWORK_VERDICTS = {
 }
 
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+
+SUBSCRIPTIONS_FILE = 'subscriptions.txt'
+
+TEMPLATES_FILE = 'templates.json'
+
+MESSAGE_LOCALE = 'ru'
+
+MESSAGE_FORMAT = 'plain'
+
+RENDER_CACHE_SIZE = 4096
+
+SCHEDULER_TICK = 1
+
+MAX_CONCURRENT_POLLS = 1000
+
+MAX_CONCURRENT_REQUESTS = 64
+
+HTTP_POOL_SIZE = 10
+
+HTTP_TIMEOUT = 30
+
+BREAKER_FAILURE_THRESHOLD = 5
+
+BREAKER_RESET_TIMEOUT = 30
+
+STATE_DB = 'homework_state.sqlite3'
+
+STATE_FLUSH_BATCH = 500
+
+STATE_FLUSH_INTERVAL = 5
+
+BACKFILL_CHUNK_SIZE = 64 * 1024
+
+REVIEWING_PERIOD = 120
+
+MAX_RETRY_PERIOD = 3600
+
+MAX_BACKOFF_STEPS = 6
+
+SCHEDULER_JITTER = 0.1
+
+WHEEL_SLOTS = 64
+
+WHEEL_LEVELS = 4
+
+INGEST_PORT = 0
+
+INGEST_SPOOL = ''
+
+RECONCILE_PERIOD = 3600
+
+SHARD_WORKERS = 1
+
+SHARD_REPLICAS = 100
+
+SHARD_HEARTBEAT = 10
+
+SHARD_LEASE_TTL = 30
+
+WEBHOOK_LISTEN = '0.0.0.0'
+
+WEBHOOK_PORT = 8443
+
+WEBHOOK_PATH = ''
+
+TELEGRAM_GLOBAL_RATE = 30
+
+TELEGRAM_CHAT_INTERVAL = 1
+
+MAX_MESSAGE_LENGTH = 4096
+
+DELIVERY_MAX_RETRIES = 5
+
+DELIVERY_STOP_TIMEOUT = 10
+
+DEDUP_MAX_SIZE = 100000
+
+DEDUP_STATUS_TTL = 30 * 24 * 60 * 60
+
+ERROR_SUPPRESSION_WINDOW = 60 * 60
+
+METRICS_PORT = 9100
+
+LOG_FILE = 'logs.log'
+
+LOG_FORMAT = 'text'
+
+LOG_MAX_BYTES = 10 * 1024 * 1024
+
+LOG_BACKUP_COUNT = 5
+
+LOG_ROTATE_WHEN = ''
@@ -0,0 +1,156 @@
+import bisect
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+
+from settings import SHARD_LEASE_TTL, SHARD_REPLICAS
+
+
+def ring_hash(value: str) -> int:
+    """Стабильный между процессами 64-битный хеш строки."""
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing:
+    """Консистентное хеширование ключей по воркерам.
+
+    У каждого воркера replicas точек на кольце; ключ принадлежит
+    воркеру первой точки по часовой стрелке. При добавлении или
+    уходе воркера переезжает лишь около 1/N ключей.
+    """
+
+    def __init__(self, nodes=(), replicas: int = SHARD_REPLICAS):
+        points = sorted(
+            (ring_hash(f'{node}#{replica}'), node)
+            for node in nodes
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node(self, key: str):
+        """Воркер, которому принадлежит ключ, или None без воркеров."""
+        if not self._nodes:
+            return None
+        index = bisect.bisect(self._hashes, ring_hash(key))
+        return self._nodes[index % len(self._nodes)]
+
+
+class LeaseTable:
+    """Таблица аренды воркеров в общей базе SQLite.
+
+    Живой воркер продлевает аренду раз в SHARD_HEARTBEAT секунд;
+    воркер, не продливший её за ttl секунд, считается ушедшим.
+    """
+
+    def __init__(self, path: str, ttl: float = SHARD_LEASE_TTL,
+                 clock=time.time, journal_mode: str = 'WAL'):
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=ttl, check_same_thread=False
+        )
+        with self._connection:
+            self._connection.execute(f'PRAGMA journal_mode={journal_mode}')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS leases ('
+                'worker_id TEXT PRIMARY KEY, expires_at REAL NOT NULL)'
+            )
+
+    def renew(self, worker_id: str) -> None:
+        """Продлевает аренду воркера."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO leases VALUES (?, ?)',
+                (worker_id, self.clock() + self.ttl),
+            )
+
+    def release(self, worker_id: str) -> None:
+        """Освобождает аренду при остановке воркера."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                'DELETE FROM leases WHERE worker_id = ?', (worker_id,)
+            )
+
+    def workers(self) -> list:
+        """Живые воркеры в порядке идентификаторов."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT worker_id FROM leases WHERE expires_at > ? '
+                'ORDER BY worker_id',
+                (self.clock(),),
+            ).fetchall()
+        return [worker_id for worker_id, in rows]
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        self._connection.close()
+
+
+class Shard:
+    """Часть подписок, которую опрашивает этот воркер.
+
+    Подписки распределяются по токену, поэтому все чаты одного
+    токена опрашивает один воркер и их запросы объединяются.
+    Токен, прежний владелец которого ещё жив, воркер начинает
+    опрашивать через adopt_delay секунд после смены состава: за это
+    время прежний владелец замечает смену на своём продлении аренды,
+    перестаёт опрашивать токен и записывает его состояние в базу.
+    """
+
+    def __init__(self, worker_id: str, leases: LeaseTable,
+                 adopt_delay: float = SHARD_LEASE_TTL):
+        self.worker_id = worker_id
+        self.leases = leases
+        self.adopt_delay = adopt_delay
+        self.workers = []
+        self.ring = HashRing()
+        self.previous = None
+        self.adopt_at = 0
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Продлевает аренду и перестраивает кольцо при смене воркеров.
+
+        Возвращает True, если состав воркеров изменился или воркер
+        начал опрашивать токены, перешедшие к нему от живых воркеров.
+        """
+        self.leases.renew(self.worker_id)
+        workers = self.leases.workers()
+        now = self.leases.clock()
+        if workers == self.workers:
+            if self.previous is None or now < self.adopt_at:
+                return False
+            self.previous = None
+            return True
+        logging.info('Воркеры: %s, этот воркер: %s.',
+                     ', '.join(workers), self.worker_id)
+        if self.previous is None:
+            self.previous = self.ring if self.workers else HashRing(
+                [worker for worker in workers if worker != self.worker_id]
+            )
+        self.adopt_at = now + self.adopt_delay
+        self.workers = workers
+        self.ring = HashRing(workers)
+        return True
+
+    def owns(self, subscription) -> bool:
+        """Опрашивает ли подписку этот воркер."""
+        if self.ring.node(subscription.token) != self.worker_id:
+            return False
+        if self.previous is None:
+            return True
+        previous = self.previous.node(subscription.token)
+        return previous in (None, self.worker_id) or (
+            previous not in self.workers
+        )
+
+    def close(self) -> None:
+        """Освобождает аренду, чтобы подписки сразу перешли к другим."""
+        self.leases.release(self.worker_id)
+        self.leases.close()
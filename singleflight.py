@@ -0,0 +1,54 @@
+import threading
+
+from metrics import COALESCED_REQUESTS
+
+
+class Flight:
+    """Выполняющийся вызов и его результат."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Объединяет одновременные вызовы с одинаковым ключом.
+
+    Первый вызов с ключом выполняет функцию, остальные, пришедшие
+    до его завершения, ждут и получают тот же результат или то же
+    исключение. После завершения ключ освобождается.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.shared_count = 0
+
+    def do(self, key, func, *args):
+        """Выполняет func(*args) или ждёт результата такого же вызова."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+            else:
+                self.shared_count += 1
+        if not leader:
+            COALESCED_REQUESTS.inc()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = func(*args)
+            return flight.result
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
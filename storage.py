@@ -0,0 +1,219 @@
+import sqlite3
+import threading
+import time
+
+from settings import STATE_FLUSH_BATCH, STATE_FLUSH_INTERVAL
+
+
+class StateStore:
+    """Хранилище состояния подписок: курсор current_date и статусы дз.
+
+    Хранилище в памяти; используется в тестах и как основа для
+    постоянных хранилищ.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._statuses = {}
+
+    def load_subscriptions(self) -> list:
+        """Возвращает (token, chat_id, timestamp, last_message) подписок."""
+        return [
+            (token, chat_id, timestamp, last_message)
+            for (token, chat_id), (timestamp, last_message)
+            in self._subscriptions.items()
+        ]
+
+    def save_subscription(self, subscription) -> None:
+        """Сохраняет курсор и последнее сообщение подписки."""
+        self._subscriptions[subscription.key] = (
+            subscription.timestamp, subscription.last_message
+        )
+
+    def remove_subscription(self, key) -> None:
+        """Удаляет подписку и её статусы."""
+        self._subscriptions.pop(key, None)
+        self._statuses.pop(key, None)
+
+    def load_statuses(self, key) -> dict:
+        """Возвращает последние отправленные статусы дз подписки."""
+        return dict(self._statuses.get(key, {}))
+
+    def save_status(self, key, homework_name: str, status: str) -> None:
+        """Сохраняет последний отправленный статус домашней работы."""
+        self._statuses.setdefault(key, {})[homework_name] = status
+
+    def save_statuses(self, keys: list, statuses: list) -> None:
+        """Сохраняет статусы [(работа, статус), ...] для подписок keys."""
+        for key in keys:
+            self._statuses.setdefault(key, {}).update(statuses)
+
+    def flush(self) -> None:
+        """Записывает накопленные изменения."""
+
+    def close(self) -> None:
+        """Закрывает хранилище, предварительно записав изменения."""
+        self.flush()
+
+
+class SQLiteStateStore(StateStore):
+    """Хранилище состояния в SQLite.
+
+    Изменения копятся в памяти и записываются одной транзакцией,
+    когда их набирается STATE_FLUSH_BATCH или проходит
+    STATE_FLUSH_INTERVAL секунд. По умолчанию база работает в режиме
+    WAL, которому нужна общая память процессов одной машины; для базы
+    на сетевом диске нужен journal_mode='DELETE'.
+    """
+
+    def __init__(self, path: str, batch_size: int = STATE_FLUSH_BATCH,
+                 flush_interval: float = STATE_FLUSH_INTERVAL,
+                 journal_mode: str = 'WAL'):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending_subscriptions = {}
+        self._pending_statuses = {}
+        self._flushed_at = time.monotonic()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(
+            f'''
+            PRAGMA journal_mode={journal_mode};
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                token TEXT NOT NULL,
+                chat_id TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                last_message TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (token, chat_id)
+            );
+            CREATE TABLE IF NOT EXISTS statuses (
+                token TEXT NOT NULL,
+                chat_id TEXT NOT NULL,
+                homework_name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                PRIMARY KEY (token, chat_id, homework_name)
+            );
+            '''
+        )
+
+    def load_subscriptions(self) -> list:
+        """Возвращает (token, chat_id, timestamp, last_message) подписок."""
+        self.flush()
+        with self._lock:
+            return self._connection.execute(
+                'SELECT token, chat_id, timestamp, last_message '
+                'FROM subscriptions'
+            ).fetchall()
+
+    def save_subscription(self, subscription) -> None:
+        """Ставит в очередь запись курсора и последнего сообщения."""
+        with self._lock:
+            self._pending_subscriptions[subscription.key] = (
+                subscription.timestamp, subscription.last_message
+            )
+        self._maybe_flush()
+
+    def remove_subscription(self, key) -> None:
+        """Удаляет подписку и её статусы."""
+        self.flush()
+        with self._lock, self._connection:
+            self._connection.execute(
+                'DELETE FROM subscriptions WHERE token = ? AND chat_id = ?',
+                key,
+            )
+            self._connection.execute(
+                'DELETE FROM statuses WHERE token = ? AND chat_id = ?', key
+            )
+
+    def load_statuses(self, key) -> dict:
+        """Возвращает последние отправленные статусы дз подписки."""
+        with self._lock:
+            statuses = dict(self._connection.execute(
+                'SELECT homework_name, status FROM statuses '
+                'WHERE token = ? AND chat_id = ?',
+                key,
+            ).fetchall())
+            for (pending_key, name), status in (
+                    self._pending_statuses.items()):
+                if pending_key == key:
+                    statuses[name] = status
+        return statuses
+
+    def save_status(self, key, homework_name: str, status: str) -> None:
+        """Ставит в очередь запись статуса домашней работы."""
+        with self._lock:
+            self._pending_statuses[(key, homework_name)] = status
+        self._maybe_flush()
+
+    def save_statuses(self, keys: list, statuses: list) -> None:
+        """Записывает статусы сразу для подписок keys одной транзакцией.
+
+        Пачка пишется в базу немедленно, минуя очередь записи;
+        статусы из очереди новее и при сбросе перезапишут пачку.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO statuses '
+                '(token, chat_id, homework_name, status) '
+                'VALUES (?, ?, ?, ?)',
+                [
+                    (token, chat_id, name, status)
+                    for token, chat_id in keys
+                    for name, status in statuses
+                ],
+            )
+
+    def _maybe_flush(self) -> None:
+        pending = (
+            len(self._pending_subscriptions) + len(self._pending_statuses)
+        )
+        if (pending >= self.batch_size
+                or time.monotonic() - self._flushed_at
+                >= self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Записывает накопленные изменения одной транзакцией."""
+        with self._lock:
+            subscriptions = self._pending_subscriptions
+            statuses = self._pending_statuses
+            self._pending_subscriptions = {}
+            self._pending_statuses = {}
+            self._flushed_at = time.monotonic()
+            if not subscriptions and not statuses:
+                return
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO subscriptions '
+                    '(token, chat_id, timestamp, last_message) '
+                    'VALUES (?, ?, ?, ?)',
+                    [
+                        (token, chat_id, timestamp, last_message)
+                        for (token, chat_id), (timestamp, last_message)
+                        in subscriptions.items()
+                    ],
+                )
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO statuses '
+                    '(token, chat_id, homework_name, status) '
+                    'VALUES (?, ?, ?, ?)',
+                    [
+                        (token, chat_id, name, status)
+                        for ((token, chat_id), name), status
+                        in statuses.items()
+                    ],
+                )
+
+    def close(self) -> None:
+        """Записывает изменения и закрывает соединение с базой."""
+        self.flush()
+        self._connection.close()
+
+
+def open_store(url: str, journal_mode: str = 'WAL') -> StateStore:
+    """Открывает хранилище: "memory" или путь к файлу SQLite."""
+    if url == 'memory':
+        return StateStore()
+    return SQLiteStateStore(url, journal_mode=journal_mode)
@@ -0,0 +1,99 @@
+import logging
+import os
+
+
+class Subscription:
+    """Подписка чата на статусы домашек по токену Практикума."""
+
+    __slots__ = (
+        'token', 'chat_id', 'key', 'timestamp', 'last_message',
+        'status', 'idle_polls', 'statuses', 'saved_timestamp', 'unsaved',
+        'unsent',
+    )
+
+    def __init__(self, token: str, chat_id, timestamp: int = 0):
+        self.token = token
+        self.chat_id = str(chat_id)
+        self.key = (self.token, self.chat_id)
+        self.timestamp = int(timestamp)
+        self.last_message = ''
+        self.status = None
+        self.idle_polls = 0
+        self.statuses = None
+        self.saved_timestamp = self.timestamp
+        self.unsaved = []
+        self.unsent = 0
+
+    def __repr__(self):
+        return f'<Subscription chat_id={self.chat_id}>'
+
+
+class SubscriptionRegistry:
+    """Реестр подписок, по которым бот опрашивает API.
+
+    added - число добавленных подписок, по нему планировщик узнаёт
+    о новых подписках без обхода реестра.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._tokens = {}
+        self.added = 0
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def __iter__(self):
+        return iter(list(self._subscriptions.values()))
+
+    def __contains__(self, key):
+        return key in self._subscriptions
+
+    def get(self, key):
+        """Возвращает подписку по ключу или None."""
+        return self._subscriptions.get(key)
+
+    def by_token(self, token: str) -> list:
+        """Возвращает все подписки с токеном."""
+        return list(self._tokens.get(token, ()))
+
+    def add(self, token: str, chat_id, timestamp: int = 0) -> Subscription:
+        """Добавляет подписку, если её ещё нет, и возвращает её."""
+        subscription = Subscription(token, chat_id, timestamp)
+        if subscription.key in self._subscriptions:
+            return self._subscriptions[subscription.key]
+        self._subscriptions[subscription.key] = subscription
+        self._tokens.setdefault(token, []).append(subscription)
+        self.added += 1
+        return subscription
+
+    def remove(self, key) -> None:
+        """Удаляет подписку из реестра."""
+        subscription = self._subscriptions.pop(key, None)
+        if subscription is None:
+            return
+        chats = self._tokens[subscription.token]
+        chats.remove(subscription)
+        if not chats:
+            del self._tokens[subscription.token]
+
+    def load_file(self, path: str, timestamp: int = 0) -> int:
+        """Загружает подписки из файла со строками "токен chat_id"."""
+        if not os.path.exists(path):
+            return 0
+        loaded = 0
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    token, chat_id = line.split()
+                except ValueError:
+                    logging.error(
+                        'Некорректная строка в файле подписок: %s', path
+                    )
+                    continue
+                self.add(token, chat_id, timestamp)
+                loaded += 1
+        return loaded
@@ -0,0 +1,177 @@
+import functools
+import html
+import json
+import logging
+import os
+import re
+import string
+
+from schema import STATUSES
+from settings import (
+    HOMEWORK_VERDICTS, MAX_MESSAGE_LENGTH, MESSAGE_FORMAT, MESSAGE_LOCALE,
+    RENDER_CACHE_SIZE, TEMPLATES_FILE,
+)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MARKDOWN_SPECIAL = re.compile(r'([_*`\[])')
+ELLIPSIS = '…'
+
+
+def escape_markdown(text: str) -> str:
+    """Экранирует разметку Markdown Telegram, как telegram.utils.helpers."""
+    return MARKDOWN_SPECIAL.sub(r'\\\1', text)
+
+
+FORMATS = {
+    'plain': (None, str),
+    'markdown': ('Markdown', escape_markdown),
+    'html': ('HTML', html.escape),
+}
+FIELDS = ('name', 'verdict', 'comment')
+DEFAULT_TEMPLATES = {
+    'ru': {
+        'verdicts': HOMEWORK_VERDICTS,
+        'plain': {
+            'status': 'Изменился статус проверки работы "{name}". {verdict}',
+            'comment': '',
+        },
+    },
+}
+
+
+def load_templates(path: str = TEMPLATES_FILE) -> dict:
+    """Читает шаблоны сообщений из JSON-файла.
+
+    Относительный путь считается от каталога бота. Без файла
+    используются шаблоны parse_status на русском без разметки.
+    """
+    path = os.path.join(BASE_DIR, path)
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        logging.warning('Нет файла шаблонов %s, используются шаблоны '
+                        'по умолчанию.', path)
+        return DEFAULT_TEMPLATES
+
+
+def compile_template(template: str) -> tuple:
+    """Разбирает шаблон str.format в пары (текст, поле) один раз.
+
+    Неизвестное поле вызывает ValueError при загрузке шаблонов,
+    а не при отправке сообщения.
+    """
+    pieces = []
+    for text, field, spec, conversion in string.Formatter().parse(template):
+        if field is not None and (field not in FIELDS or spec or conversion):
+            raise ValueError(
+                f'Некорректное поле "{field}" в шаблоне "{template}".'
+            )
+        pieces.append((text, field))
+    return tuple(pieces)
+
+
+def render_template(pieces: tuple, values: dict) -> str:
+    """Подставляет значения в скомпилированный шаблон."""
+    return ''.join(
+        text if field is None else text + values[field]
+        for text, field in pieces
+    )
+
+
+class MessageRenderer:
+    """Сообщения о статусах домашек по шаблонам локали и формата.
+
+    Формат - plain, markdown или html; название работы, комментарий
+    ревьюера и тексты ошибок экранируются под формат. Шаблоны
+    компилируются при создании, готовые сообщения кэшируются
+    по работе, статусу и локали, поэтому при рассылке одного статуса
+    многим чатам сообщение формируется один раз. Слишком длинный
+    комментарий ревьюера обрезается, чтобы сообщение уложилось
+    в max_length символов.
+    """
+
+    def __init__(self, templates: dict = None, locale: str = MESSAGE_LOCALE,
+                 fmt: str = MESSAGE_FORMAT,
+                 cache_size: int = RENDER_CACHE_SIZE,
+                 max_length: int = MAX_MESSAGE_LENGTH):
+        if fmt not in FORMATS:
+            raise ValueError(f'Неизвестный формат сообщений "{fmt}".')
+        if templates is None:
+            templates = load_templates()
+        self.locale = locale
+        self.format = fmt
+        self.max_length = max_length
+        self.parse_mode, self.escape = FORMATS[fmt]
+        self._locales = {}
+        for name, locale_templates in templates.items():
+            if fmt not in locale_templates:
+                continue
+            try:
+                verdicts = tuple(
+                    locale_templates['verdicts'][status]
+                    for status in STATUSES
+                )
+            except KeyError as error:
+                raise ValueError(
+                    f'Нет вердикта {error} в шаблонах локали "{name}".'
+                ) from None
+            self._locales[name] = (
+                compile_template(locale_templates[fmt]['status']),
+                compile_template(locale_templates[fmt].get('comment', '')),
+                verdicts,
+            )
+        if locale not in self._locales:
+            raise ValueError(
+                f'Нет шаблонов локали "{locale}" в формате "{fmt}".'
+            )
+        self._render = functools.lru_cache(maxsize=cache_size)(self._build)
+
+    def status(self, homework, locale: str = None) -> str:
+        """Сообщение об изменении статуса работы."""
+        return self._render(
+            homework.name, homework.code, homework.comment,
+            locale or self.locale,
+        )
+
+    def verdict(self, code: int, locale: str = None) -> str:
+        """Вердикт по коду статуса в локали."""
+        return self._templates(locale or self.locale)[2][code]
+
+    def error(self, text: str) -> str:
+        """Текст ошибки, экранированный под формат сообщений."""
+        return self.escape(text)
+
+    def cache_info(self):
+        """Статистика кэша готовых сообщений."""
+        return self._render.cache_info()
+
+    def _templates(self, locale: str) -> tuple:
+        return self._locales.get(locale) or self._locales[self.locale]
+
+    def _build(self, name: str, code: int, comment: str, locale: str) -> str:
+        status, comment_template, verdicts = self._templates(locale)
+        values = {
+            'name': self.escape(name),
+            'verdict': verdicts[code],
+            'comment': self.escape(comment),
+        }
+        message = render_template(status, values)
+        if not comment:
+            return message
+        full = message + render_template(comment_template, values)
+        if len(full) <= self.max_length:
+            return full
+        low, high = 0, len(comment)
+        while low < high:
+            middle = (low + high + 1) // 2
+            values['comment'] = self.escape(comment[:middle] + ELLIPSIS)
+            length = len(message) + len(
+                render_template(comment_template, values)
+            )
+            if length <= self.max_length:
+                low = middle
+            else:
+                high = middle - 1
+        values['comment'] = self.escape(comment[:low] + ELLIPSIS)
+        return message + render_template(comment_template, values)
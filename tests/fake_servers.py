@@ -0,0 +1,299 @@
+import collections
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PRACTICUM_PATH = '/api/user_api/homework_statuses/'
+
+
+class BacklogHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class FakeServer:
+    """Локальный HTTP-сервер в отдельном потоке."""
+
+    handler_class = None
+
+    def __init__(self):
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def start(self):
+        self._server = BacklogHTTPServer(
+            ('127.0.0.1', 0), self.handler_class
+        )
+        self._server.fake = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def send_json(self, status: int, data) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PracticumHandler(JSONHandler):
+
+    def do_GET(self):
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        if self.fake.fail():
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {})
+            return
+        url = urlparse(self.path)
+        if url.path != PRACTICUM_PATH:
+            self.send_json(HTTPStatus.NOT_FOUND, {'detail': 'Not found'})
+            return
+        authorization = self.headers.get('Authorization', '')
+        if not authorization.startswith('OAuth '):
+            self.send_json(HTTPStatus.UNAUTHORIZED, {
+                'code': 'not_authenticated',
+                'message': 'Учетные данные не были предоставлены.',
+                'source': '__response__',
+            })
+            return
+        try:
+            from_date = int(parse_qs(url.query)['from_date'][0])
+        except (KeyError, ValueError):
+            self.send_json(HTTPStatus.BAD_REQUEST, {
+                'code': 'UnknownError',
+                'error': {'error': 'Wrong from_date format'},
+            })
+            return
+        self.send_json(HTTPStatus.OK, self.fake.statuses(
+            authorization[len('OAuth '):], from_date
+        ))
+
+
+class FakePracticumServer(FakeServer):
+    """Замена API Практикума: /api/user_api/homework_statuses/.
+
+    Возвращает домашки токена, обновлённые не раньше from_date,
+    от новых к старым. Каждый ответ задерживается на latency секунд,
+    с вероятностью error_rate сервер отвечает 500. С вероятностью
+    transition_rate при каждом запросе домашка токена на ревью
+    получает вердикт approved или rejected.
+    """
+
+    handler_class = PracticumHandler
+
+    def __init__(self, latency: float = 0, error_rate: float = 0,
+                 transition_rate: float = 0, seed: int = None):
+        super().__init__()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.transition_rate = transition_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._homeworks = {}
+        self.requests_count = 0
+        self.errors_count = 0
+
+    def fail(self) -> bool:
+        """Решает, ответить ли на запрос ошибкой сервера."""
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            self.errors_count += failed
+        return failed
+
+    @property
+    def endpoint(self) -> str:
+        return self.url + PRACTICUM_PATH
+
+    def set_status(self, token: str, homework_id: int, status: str,
+                   updated_at: int = None) -> None:
+        """Создаёт домашку токена или меняет её статус."""
+        updated_at = int(time.time()) if updated_at is None else updated_at
+        with self._lock:
+            self._homeworks.setdefault(token, {})[homework_id] = (
+                self._homework(token, homework_id, status, updated_at)
+            )
+
+    @staticmethod
+    def _homework(token: str, homework_id: int, status: str,
+                  updated_at: int) -> dict:
+        return {
+            'id': homework_id,
+            'status': status,
+            'homework_name': f'{token}__hw{homework_id}.zip',
+            'reviewer_comment': '',
+            'date_updated': datetime.fromtimestamp(
+                updated_at, timezone.utc
+            ).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'lesson_name': f'Урок {homework_id}',
+            '_updated_at': updated_at,
+        }
+
+    def _transition(self, token: str) -> None:
+        for homework_id, homework in self._homeworks.get(token, {}).items():
+            if (homework['status'] == 'reviewing'
+                    and self._random.random() < self.transition_rate):
+                verdict = self._random.choice(('approved', 'rejected'))
+                homework.update(self._homework(
+                    token, homework_id, verdict, int(time.time())
+                ))
+
+    def statuses(self, token: str, from_date: int) -> dict:
+        """Тело ответа API для токена от from_date."""
+        with self._lock:
+            self.requests_count += 1
+            if self.transition_rate:
+                self._transition(token)
+            homeworks = sorted(
+                (
+                    homework
+                    for homework in self._homeworks.get(token, {}).values()
+                    if homework['_updated_at'] >= from_date
+                ),
+                key=lambda homework: homework['_updated_at'],
+                reverse=True,
+            )
+        return {
+            'homeworks': [
+                {key: value for key, value in homework.items()
+                 if not key.startswith('_')}
+                for homework in homeworks
+            ],
+            'current_date': int(time.time()),
+        }
+
+
+class TelegramHandler(JSONHandler):
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length) or b'{}')
+        method = self.path.rsplit('/', 1)[-1]
+        if method == 'getMe':
+            self.send_json(HTTPStatus.OK, {'ok': True, 'result': {
+                'id': 123456, 'is_bot': True, 'first_name': 'homework_bot',
+                'username': 'homework_bot',
+            }})
+            return
+        if method == 'deleteMessage':
+            self.fake.deleted.append(
+                (str(data['chat_id']), int(data['message_id']))
+            )
+            self.send_json(HTTPStatus.OK, {'ok': True, 'result': True})
+            return
+        if method != 'sendMessage':
+            self.send_json(HTTPStatus.NOT_FOUND, {
+                'ok': False, 'error_code': 404, 'description': 'Not Found'
+            })
+            return
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        retry_after = self.fake.retry_after(data['chat_id'])
+        if retry_after:
+            self.send_json(HTTPStatus.TOO_MANY_REQUESTS, {
+                'ok': False,
+                'error_code': 429,
+                'description': (
+                    f'Too Many Requests: retry after {retry_after}'
+                ),
+                'parameters': {'retry_after': retry_after},
+            })
+            return
+        self.send_json(HTTPStatus.OK, {
+            'ok': True,
+            'result': self.fake.send_message(data['chat_id'], data['text']),
+        })
+
+
+class FakeTelegramServer(FakeServer):
+    """Замена Bot API Telegram: getMe, sendMessage и deleteMessage.
+
+    Боту передаётся base_url=server.base_url. Как и настоящий Bot API,
+    сервер отвечает 429 с retry_after, если в чат отправляют чаще
+    раза в chat_interval секунд или всего больше global_rate
+    сообщений в секунду.
+    """
+
+    handler_class = TelegramHandler
+
+    def __init__(self, chat_interval: float = 0, global_rate: int = None,
+                 latency: float = 0):
+        super().__init__()
+        self.chat_interval = chat_interval
+        self.global_rate = global_rate
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._chat_sent_at = {}
+        self._recent = collections.deque()
+        self.messages = []
+        self.deleted = []
+        self.rate_limited_count = 0
+
+    @property
+    def base_url(self) -> str:
+        return self.url + '/bot'
+
+    def retry_after(self, chat_id) -> int:
+        """Секунды до разрешённой отправки в чат или 0."""
+        now = time.monotonic()
+        with self._lock:
+            wait = 0
+            sent_at = self._chat_sent_at.get(str(chat_id))
+            if sent_at is not None:
+                wait = sent_at + self.chat_interval - now
+            if self.global_rate:
+                while self._recent and self._recent[0] <= now - 1:
+                    self._recent.popleft()
+                if len(self._recent) >= self.global_rate:
+                    wait = max(wait, self._recent[0] + 1 - now)
+            if wait > 0:
+                self.rate_limited_count += 1
+                return max(1, round(wait))
+            self._chat_sent_at[str(chat_id)] = now
+            self._recent.append(now)
+        return 0
+
+    def send_message(self, chat_id, text: str) -> dict:
+        """Запоминает сообщение и возвращает его в формате Bot API."""
+        with self._lock:
+            self.messages.append((str(chat_id), text))
+            message_id = len(self.messages)
+        return {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': int(chat_id), 'type': 'private'},
+            'text': text,
+        }
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from fake_servers import FakePracticumServer
+
+
+def chunked(body: bytes, size: int) -> list:
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+class TestBackfill:
+
+    @pytest.mark.parametrize('size', [1, 7, 1 << 20])
+    def test_iter_homeworks_matches_json(self, size):
+        from backfill import iter_homeworks
+
+        data = {
+            'current_date': 1234567890,
+            'homeworks': [
+                {'id': index, 'homework_name': f'работа_{index}.zip',
+                 'status': 'approved', 'reviewer_comment': 'Ура! "ок"'}
+                for index in range(20)
+            ],
+            'extra': {'nested': [1, 2, {'a': None}]},
+        }
+        body = json.dumps(data, ensure_ascii=False, indent=1).encode()
+        assert list(iter_homeworks(chunked(body, size))) == data['homeworks']
+
+    @pytest.mark.parametrize('body, error', [
+        (b'[]', TypeError),
+        (b'{"current_date": 1}', KeyError),
+        (b'{"homeworks": {}}', TypeError),
+        (b'{"homeworks": [{"id": 1}, {"id"', ValueError),
+    ])
+    def test_iter_homeworks_errors(self, body, error):
+        from backfill import iter_homeworks
+
+        with pytest.raises(error):
+            list(iter_homeworks(chunked(body, 3)))
+
+    def test_backfill_once_per_token_in_batches(self, tmp_path):
+        import engine
+        from storage import SQLiteStateStore
+        from subscriptions import SubscriptionRegistry
+
+        registry = SubscriptionRegistry()
+        student = registry.add('token', 1, 10 ** 10)
+        mentor = registry.add('token', 2, 10 ** 10)
+        store = SQLiteStateStore(str(tmp_path / 'state.sqlite3'))
+        with FakePracticumServer() as practicum:
+            for homework_id in range(5):
+                practicum.set_status('token', homework_id, 'approved', 100)
+            bot_engine = engine.Engine(
+                registry, None, store=store, endpoint=practicum.endpoint
+            )
+            assert bot_engine.backfill_token('token', batch_size=2) == 5
+            assert practicum.requests_count == 1
+        expected = {str(homework_id): 'approved' for homework_id in range(5)}
+        assert store.load_statuses(student.key) == expected
+        assert store.load_statuses(mentor.key) == expected
+        assert [cursor for _, _, cursor, _ in store.load_subscriptions()] == [
+            10 ** 10, 10 ** 10
+        ]
+        response = {
+            'homeworks': [{'id': 3, 'homework_name': 'token__hw3.zip',
+                           'status': 'approved'}],
+            'current_date': 10 ** 10,
+        }
+        assert bot_engine.process_response(student, response) == []
+        store.close()
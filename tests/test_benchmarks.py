@@ -0,0 +1,49 @@
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'benchmarks',
+)
+sys.path.append(BENCHMARKS_DIR)
+
+
+class TestBenchmarks:
+
+    def test_pipeline_benchmark_runs(self):
+        import bench_pipeline
+
+        result = bench_pipeline.bench_pipeline(
+            subscribers=20, concurrency=4, change_rate=0.5
+        )
+        assert result['messages'] == 10
+        assert result['polls_per_sec'] > 0
+        assert result['p99_ms'] >= result['p50_ms']
+        assert result['bytes_per_subscriber'] > 0
+
+    def test_validation_benchmark_runs(self):
+        import bench_validation
+
+        result = bench_validation.bench_validation(homeworks=5, iterations=50)
+        assert result['dicts_per_sec'] > 0
+        assert result['schema_per_sec'] > 0
+
+    def test_timers_benchmark_runs(self):
+        import bench_timers
+
+        result = bench_timers.bench_timers(1000, period=100)
+        assert result['wheel']['fired'] == 900
+
+    def test_import_benchmark_runs(self):
+        import bench_import
+
+        for module in ('homework', 'engine', 'cli'):
+            result = bench_import.import_time(module)
+            assert result['ms'] > 0
+            assert result['heavy'] == []
+
+    def test_backfill_benchmark_runs(self):
+        import bench_backfill
+
+        result = bench_backfill.bench_backfill(2000, chunk_size=4096)
+        assert result['stream_peak'] < result['loads_peak']
@@ -0,0 +1,93 @@
+import pytest
+
+from fake_servers import FakePracticumServer
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+
+    def test_opens_and_probes(self):
+        from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+        clock = FakeClock()
+        breaker = CircuitBreaker('test', failure_threshold=3,
+                                 reset_timeout=10, clock=clock)
+        for _ in range(3):
+            assert breaker.allow()
+            breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+        clock.now = 10
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+        clock.now = 20
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+        assert breaker.rejected_count == 3
+
+    def test_success_resets_failures(self):
+        from circuit_breaker import CLOSED, CircuitBreaker
+
+        breaker = CircuitBreaker('test', failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+
+    def test_outage_sends_single_probe(self):
+        from circuit_breaker import CircuitBreaker
+        from exceptions import CircuitOpen
+        from http_client import PracticumClient
+
+        clock = FakeClock()
+        client = PracticumClient(pool_size=2)
+        with FakePracticumServer(error_rate=1) as practicum:
+            breaker = CircuitBreaker(practicum.endpoint, clock=clock)
+            client._breakers[practicum.endpoint] = breaker
+            for _ in range(breaker.failure_threshold):
+                with pytest.raises(Exception, match='status_code 500'):
+                    client.get_statuses({}, 0, 'key', practicum.endpoint)
+            for _ in range(10):
+                with pytest.raises(CircuitOpen):
+                    client.get_statuses({}, 0, 'key', practicum.endpoint)
+            assert practicum.requests_count + practicum.errors_count == (
+                breaker.failure_threshold
+            )
+
+            practicum.error_rate = 0
+            clock.now = breaker.reset_timeout
+            response = client.get_statuses(
+                {'Authorization': 'OAuth token'}, 0, 'key', practicum.endpoint
+            )
+            assert response['homeworks'] == []
+        assert client.stats()['circuit_rejected'] == 10
+        client.close()
+
+    def test_engine_does_not_notify_skipped_poll(self):
+        import engine
+        from exceptions import CircuitOpen
+        from subscriptions import SubscriptionRegistry
+
+        registry = SubscriptionRegistry()
+        subscription = registry.add('token', 1)
+        bot_engine = engine.Engine(registry, None)
+        assert bot_engine.process_response(
+            subscription, CircuitOpen('endpoint')
+        ) == []
+        assert subscription.idle_polls == 0
@@ -0,0 +1,68 @@
+import telegram
+
+from fake_servers import FakePracticumServer, FakeTelegramServer
+
+
+class TestCli:
+
+    def test_backfill_poll_once_status(self, tmp_path, monkeypatch, capsys):
+        import cli
+        import engine
+
+        subscriptions = tmp_path / 'subscriptions.txt'
+        subscriptions.write_text('token 1\n', encoding='utf-8')
+        monkeypatch.setattr(engine, 'SUBSCRIPTIONS_PATH', str(subscriptions))
+        monkeypatch.setattr(
+            engine, 'STATE_DB_PATH', str(tmp_path / 'state.sqlite3')
+        )
+        monkeypatch.setattr(engine, 'PRACTICUM_TOKEN', None)
+        monkeypatch.setattr(engine, 'TELEGRAM_TOKEN', '123456:fake')
+        with FakePracticumServer() as practicum, \
+                FakeTelegramServer() as telegram_server:
+            monkeypatch.setattr(engine, 'ENDPOINT', practicum.endpoint)
+            monkeypatch.setattr(engine, 'make_bot', lambda: telegram.Bot(
+                token='123456:fake', base_url=telegram_server.base_url
+            ))
+            practicum.set_status('token', 1, 'reviewing', 1000)
+
+            assert cli.run(['backfill']) == 0
+            assert 'backfill: подписок 1, токенов 1, работ 1' in (
+                capsys.readouterr().out
+            )
+
+            practicum.set_status('token', 2, 'approved', 2 ** 31)
+            assert cli.run(['poll-once']) == 0
+            output = capsys.readouterr().out
+            assert 'poll-once: подписок 1, отправлено 1' in output
+            assert [chat for chat, _ in telegram_server.messages] == ['1']
+            assert '__hw2.zip' in telegram_server.messages[0][1]
+
+            practicum.error_rate = 1
+            assert cli.run(['poll-once']) == 1
+            capsys.readouterr()
+
+        assert cli.run(['status']) == 0
+        output = capsys.readouterr().out
+        assert 'Чат 1, токен ...oken' in output
+        assert 'Работа 1: reviewing' in output
+        assert 'Работа 2: approved' in output
+        assert 'status: подписок 1, всего' in output
+
+    def test_poll_once_counts_undelivered_messages(self):
+        import types
+
+        import cli
+        from delivery import DeliveryQueue
+
+        async def poll_once():
+            delivery.put(1, 'first')
+            delivery.put(2, 'second')
+            return 2
+
+        delivery = DeliveryQueue(None)
+        engine = types.SimpleNamespace(
+            poll_once=poll_once, delivery=delivery, errors_count=0
+        )
+        result = cli.poll_once(engine)
+        assert result['sent'] == 0
+        assert result['failed'] == 2
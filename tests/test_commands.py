@@ -0,0 +1,104 @@
+import pytest
+import telegram
+
+from fake_servers import FakeTelegramServer
+
+
+def command(bot: telegram.Bot, chat_id: int, text: str) -> telegram.Update:
+    return telegram.Update.de_json({
+        'update_id': 1,
+        'message': {
+            'message_id': 10,
+            'date': 0,
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': text,
+            'entities': [{
+                'type': 'bot_command',
+                'offset': 0,
+                'length': len(text.split()[0]),
+            }],
+        },
+    }, bot)
+
+
+@pytest.fixture
+def bot_engine():
+    import commands
+    import engine
+    from subscriptions import SubscriptionRegistry
+
+    with FakeTelegramServer() as tg:
+        bot = telegram.Bot(token='123456:test', base_url=tg.base_url)
+        bot_engine = engine.Engine(SubscriptionRegistry(), bot)
+        updater = commands.build_updater(bot_engine, bot)
+        yield bot_engine, updater.dispatcher, tg
+
+
+class TestCommands:
+
+    def test_start_status_stop(self, bot_engine):
+        bot_engine, dispatcher, tg = bot_engine
+        bot = bot_engine.bot
+
+        dispatcher.process_update(command(bot, 7, '/start practicum'))
+        assert ('7', 10) in tg.deleted
+        assert ('practicum', '7') in bot_engine.registry
+        subscription = bot_engine.registry.get(('practicum', '7'))
+
+        bot_engine.process_response(subscription, {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw', 'status': 'approved'}
+            ],
+            'current_date': 1,
+        })
+        dispatcher.process_update(command(bot, 7, '/status'))
+        assert tg.messages[-1] == (
+            '7',
+            'Работа "hw": Работа проверена: ревьюеру всё понравилось. Ура!'
+        )
+
+        dispatcher.process_update(command(bot, 7, '/stop'))
+        assert tg.messages[-1] == ('7', 'Подписка отменена.')
+        assert not bot_engine.registry
+
+    def test_status_without_subscription(self, bot_engine):
+        import commands
+
+        bot_engine, dispatcher, tg = bot_engine
+        dispatcher.process_update(command(bot_engine.bot, 8, '/status'))
+        assert tg.messages == [('8', commands.START_HELP)]
+
+    def test_stop_during_poll_keeps_subscription_removed(self, bot_engine):
+        bot_engine, dispatcher, tg = bot_engine
+        bot = bot_engine.bot
+
+        dispatcher.process_update(command(bot, 7, '/start practicum'))
+        subscription = bot_engine.registry.get(('practicum', '7'))
+        dispatcher.process_update(command(bot, 7, '/stop'))
+        bot_engine.process_response(subscription, {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw', 'status': 'approved'}
+            ],
+            'current_date': 1,
+        })
+        assert bot_engine.store.load_subscriptions() == []
+        assert bot_engine.store.load_statuses(subscription.key) == {}
+
+    def test_webhook_path_is_not_guessable(self):
+        import commands
+
+        class Updater:
+            def start_webhook(self, **kwargs):
+                self.kwargs = kwargs
+
+        paths = set()
+        for _ in range(2):
+            updater = Updater()
+            commands.start_webhook(updater, 'https://bot.example/', 8443)
+            url_path = updater.kwargs['url_path']
+            assert len(url_path) >= 32
+            assert updater.kwargs['webhook_url'] == (
+                f'https://bot.example/{url_path}'
+            )
+            paths.add(url_path)
+        assert len(paths) == 2
@@ -0,0 +1,47 @@
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeduplicator:
+
+    def test_status_is_sent_once_until_changed(self):
+        from dedup import Deduplicator
+
+        dedup = Deduplicator(clock=FakeClock())
+        assert dedup.status_is_new(1, '7', 'reviewing')
+        assert not dedup.status_is_new(1, '7', 'reviewing')
+        assert dedup.status_is_new(2, '7', 'reviewing')
+        assert dedup.status_is_new(1, '7', 'rejected')
+        assert dedup.status_is_new(1, '7', 'reviewing')
+
+    def test_error_window(self):
+        from dedup import Deduplicator
+
+        clock = FakeClock()
+        dedup = Deduplicator(error_window=60, clock=clock)
+        assert dedup.error_is_new(1, 'A')
+        assert dedup.error_is_new(1, 'B')
+        assert not dedup.error_is_new(1, 'A')
+        assert dedup.error_is_new(2, 'A')
+        clock.now = 60
+        assert dedup.error_is_new(1, 'A')
+
+    def test_cache_is_bounded(self):
+        from dedup import TTLCache
+
+        clock = FakeClock()
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        cache.set('c', 3)
+        assert len(cache) == 2
+        assert cache.get('b') is None
+        clock.now = 10
+        assert cache.get('a') is None and cache.get('c') is None
+        assert len(cache) == 0
@@ -0,0 +1,100 @@
+import telegram
+
+import utils
+
+
+class FlakyTelegramBot(utils.MockTelegramBot):
+
+    def __init__(self, failures=(), **kwargs):
+        super().__init__(**kwargs)
+        self.failures = list(failures)
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((chat_id, text))
+
+
+class TestDeliveryQueue:
+
+    def test_token_bucket(self):
+        from delivery import TokenBucket
+
+        bucket = TokenBucket(rate=2, capacity=2)
+        now = bucket.updated_at
+        assert bucket.take(now) == 0
+        assert bucket.take(now) == 0
+        assert bucket.take(now) == 0.5
+        assert bucket.take(now + 0.5) == 0
+
+    def test_messages_for_one_chat_are_coalesced(self):
+        from delivery import DeliveryQueue
+
+        bot = FlakyTelegramBot()
+        queue = DeliveryQueue(bot, chat_interval=0)
+        queue.put(1, 'first')
+        queue.put(1, 'second')
+        queue.put(2, 'other')
+        queue.start()
+        assert queue.join(timeout=5)
+        queue.stop()
+        assert bot.sent == [('1', 'first\n\nsecond'), ('2', 'other')]
+
+    def test_retry_after_is_honored(self):
+        from delivery import DeliveryQueue
+
+        bot = FlakyTelegramBot(failures=[telegram.error.RetryAfter(0)])
+        queue = DeliveryQueue(bot, chat_interval=0)
+        queue.put(1, 'message')
+        queue.start()
+        assert queue.join(timeout=5)
+        queue.stop()
+        assert bot.sent == [('1', 'message')]
+        assert queue.sent_count == 1
+
+    def test_message_is_dropped_after_max_retries(self):
+        from delivery import DeliveryQueue
+
+        bot = FlakyTelegramBot(
+            failures=[telegram.error.NetworkError('down')] * 3
+        )
+        queue = DeliveryQueue(bot, chat_interval=0, max_retries=2)
+        queue.put(1, 'message')
+        queue.start()
+        assert queue.join(timeout=5)
+        queue.stop()
+        assert not bot.sent
+        assert queue.failed_count == 1
+
+    def test_on_done_reports_delivery(self):
+        from delivery import DeliveryQueue
+
+        bot = FlakyTelegramBot(failures=[ValueError('blocked')])
+        queue = DeliveryQueue(bot, chat_interval=0)
+        done = []
+        queue.put(1, 'dropped', lambda sent: done.append(('dropped', sent)))
+        queue.put(2, 'first', lambda sent: done.append(('first', sent)))
+        queue.put(2, 'second', lambda sent: done.append(('second', sent)))
+        queue.start()
+        assert queue.join(timeout=5)
+        queue.stop()
+        assert sorted(done) == [
+            ('dropped', False), ('first', True), ('second', True)
+        ]
+
+    def test_rejected_message_is_not_retried(self):
+        from delivery import DeliveryQueue
+
+        bot = FlakyTelegramBot(
+            failures=[telegram.error.BadRequest('Message is too long')] * 3
+        )
+        queue = DeliveryQueue(bot, chat_interval=0, max_retries=2)
+        done = []
+        queue.put(1, 'message', done.append)
+        queue.start()
+        assert queue.join(timeout=5)
+        queue.stop()
+        assert done == [False]
+        assert len(bot.failures) == 2
+        assert queue.failed_count == 1
@@ -0,0 +1,388 @@
+from http import HTTPStatus
+
+import requests
+
+import utils
+
+
+class TestEngine:
+
+    def test_registry_deduplicates_subscriptions(self):
+        from subscriptions import SubscriptionRegistry
+
+        registry = SubscriptionRegistry()
+        first = registry.add('token', 1)
+        second = registry.add('token', '1')
+        registry.add('token', 2)
+        assert first is second
+        assert len(registry) == 2
+
+    def test_registry_load_file(self, tmp_path):
+        from subscriptions import SubscriptionRegistry
+
+        path = tmp_path / 'subscriptions.txt'
+        path.write_text('# comment\ntoken1 1\n\ntoken2 2\nbroken\n')
+        registry = SubscriptionRegistry()
+        assert registry.load_file(str(path)) == 2
+        assert ('token2', '2') in registry
+
+    def test_poll_subscription_uses_own_token_and_cursor(
+            self, monkeypatch, random_timestamp):
+        import engine
+        from subscriptions import SubscriptionRegistry
+
+        calls = []
+
+        def mock_get(*args, **kwargs):
+            calls.append(kwargs)
+            return utils.MockResponseGET(
+                random_timestamp=random_timestamp, http_status=HTTPStatus.OK
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        registry = SubscriptionRegistry()
+        subscription = registry.add('student-token', 42, timestamp=100)
+        engine.Engine(registry, utils.MockTelegramBot()).poll(subscription)
+
+        assert calls[0]['headers']['Authorization'] == 'OAuth student-token'
+        assert calls[0]['params']['from_date'] == 100
+        assert subscription.timestamp == random_timestamp
+
+    def test_scheduler_spreads_polls_over_period(self):
+        import engine
+        from subscriptions import SubscriptionRegistry
+
+        registry = SubscriptionRegistry()
+        for chat_id in range(10):
+            registry.add(f'token{chat_id}', chat_id)
+        scheduler = engine.Scheduler(registry, period=100, jitter=0)
+        scheduler.schedule_new(now=0)
+        assert len(scheduler.due(now=0)) == 1
+        assert len(scheduler.due(now=50)) == 5
+        assert len(scheduler.due(now=99)) == 4
+        assert not scheduler.due(now=99)
+
+    def test_scheduler_polls_same_token_together(self):
+        import engine
+        from subscriptions import SubscriptionRegistry
+
+        registry = SubscriptionRegistry()
+        for chat_id in range(3):
+            registry.add('token', chat_id)
+        registry.add('other', 1)
+        scheduler = engine.Scheduler(registry, period=100, jitter=0.1)
+        scheduler.schedule_new(now=0)
+        assert len(scheduler.due(now=0)) == 3
+        assert len(scheduler.due(now=50)) == 1
+        assert len(scheduler.due(now=1000)) == 4
+
+    def test_same_token_polls_share_request(self, monkeypatch):
+        import threading
+        import time
+
+        import engine
+        from subscriptions import SubscriptionRegistry
+
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def mock_request(subscription):
+            calls.append(subscription)
+            started.set()
+            release.wait(5)
+            return {'homeworks': [], 'current_date': 1}
+
+        registry = SubscriptionRegistry()
+        student = registry.add('token', 1)
+        mentor = registry.add('token', 2)
+        bot_engine = engine.Engine(registry, None)
+        monkeypatch.setattr(bot_engine, 'request', mock_request)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda sub=sub: results.append(bot_engine.fetch(sub))
+            )
+            for sub in (student, mentor)
+        ]
+        threads[0].start()
+        started.wait(5)
+        threads[1].start()
+        deadline = time.monotonic() + 5
+        while not bot_engine.flights.shared_count:
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert calls == [student]
+        assert results[0] is results[1]
+
+    def test_poll_subscription_async_sends_new_status(
+            self, monkeypatch, random_timestamp):
+        import asyncio
+
+        import engine
+        from subscriptions import SubscriptionRegistry
+
+        def mock_get(*args, **kwargs):
+            response = utils.MockResponseGET(
+                random_timestamp=random_timestamp, http_status=HTTPStatus.OK
+            )
+            response.json = lambda: {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': random_timestamp,
+            }
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        registry = SubscriptionRegistry()
+        subscription = registry.add('token', 42)
+        bot = utils.MockTelegramBot()
+        bot_engine = engine.Engine(registry, bot)
+        asyncio.run(bot_engine.poll_async(subscription))
+
+        assert bot.chat_id == '42'
+        assert 'Ура!' in bot.text
+        assert bot_engine.process_response(subscription, {
+            'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+            'current_date': random_timestamp,
+        }) == []
+
+    def test_scheduler_adapts_interval_to_status(self):
+        import engine
+        from settings import MAX_RETRY_PERIOD, REVIEWING_PERIOD
+        from subscriptions import Subscription
+
+        scheduler = engine.Scheduler(None, period=600, jitter=0)
+        subscription = Subscription('token', 1)
+        assert scheduler.interval(subscription) == 600
+        subscription.status = 'reviewing'
+        assert scheduler.interval(subscription) == REVIEWING_PERIOD
+        subscription.status = 'approved'
+        subscription.idle_polls = 2
+        assert scheduler.interval(subscription) == 2400
+        subscription.idle_polls = 100
+        assert scheduler.interval(subscription) == MAX_RETRY_PERIOD
+
+    def test_scheduler_jitter_bounds(self):
+        import engine
+        from subscriptions import Subscription
+
+        scheduler = engine.Scheduler(None, period=600, jitter=0.1)
+        intervals = {
+            scheduler.interval(Subscription('token', 1)) for _ in range(50)
+        }
+        assert len(intervals) > 1
+        assert all(540 <= interval <= 660 for interval in intervals)
+
+    def test_every_changed_homework_is_notified(self, random_timestamp):
+        import engine
+        from storage import StateStore
+        from subscriptions import SubscriptionRegistry
+
+        registry = SubscriptionRegistry()
+        subscription = registry.add('token', 1)
+        store = StateStore()
+        bot_engine = engine.Engine(registry, utils.MockTelegramBot(),
+                                   store=store)
+        response = {
+            'homeworks': [
+                {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'},
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+            ],
+            'current_date': random_timestamp,
+        }
+        messages = bot_engine.process_response(subscription, response)
+        assert len(messages) == 2
+        assert '"hw1"' in messages[0] and '"hw2"' in messages[1]
+        assert subscription.status == 'reviewing'
+
+        response['homeworks'][0]['status'] = 'rejected'
+        messages = bot_engine.process_response(subscription, response)
+        assert len(messages) == 1 and '"hw2"' in messages[0]
+        assert store.load_statuses(subscription.key) == {
+            '1': 'approved', '2': 'rejected'
+        }
+
+    def test_error_is_not_repeated(self):
+        import engine
+        from subscriptions import SubscriptionRegistry
+
+        registry = SubscriptionRegistry()
+        subscription = registry.add('token', 1)
+        bot_engine = engine.Engine(registry, utils.MockTelegramBot())
+        error = Exception('API недоступен')
+        assert bot_engine.process_response(subscription, error) == [
+            'API недоступен'
+        ]
+        assert bot_engine.process_response(subscription, error) == []
+
+    def test_alternating_errors_are_suppressed(self):
+        import engine
+        from subscriptions import SubscriptionRegistry
+
+        registry = SubscriptionRegistry()
+        subscription = registry.add('token', 1)
+        bot_engine = engine.Engine(registry, utils.MockTelegramBot())
+        first = Exception('API недоступен')
+        second = Exception('Нет ключа "homeworks" в ответе от API.')
+        assert bot_engine.process_response(subscription, first) == [
+            f'{first}'
+        ]
+        assert bot_engine.process_response(subscription, second) == [
+            f'{second}'
+        ]
+        assert bot_engine.process_response(subscription, first) == []
+        assert bot_engine.process_response(subscription, second) == []
+
+    def test_statuses_are_saved_after_delivery(self, random_timestamp):
+        import engine
+        from delivery import DeliveryQueue
+        from storage import StateStore
+        from subscriptions import SubscriptionRegistry
+
+        registry = SubscriptionRegistry()
+        subscription = registry.add('token', 1, timestamp=100)
+        store = StateStore()
+        delivery = DeliveryQueue(utils.MockTelegramBot(), chat_interval=0)
+        bot_engine = engine.Engine(registry, None, store=store,
+                                   delivery=delivery)
+        response = {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+            ],
+            'current_date': random_timestamp,
+        }
+        bot_engine.notify(
+            subscription, bot_engine.process_response(subscription, response)
+        )
+        assert store.load_statuses(subscription.key) == {}
+        assert store.load_subscriptions() == []
+
+        delivery.start()
+        assert delivery.join(timeout=5)
+        delivery.stop()
+        assert store.load_statuses(subscription.key) == {'1': 'approved'}
+        assert store.load_subscriptions() == [
+            ('token', '1', random_timestamp, '')
+        ]
+
+    def test_dropped_status_is_notified_again(self):
+        import engine
+        from delivery import DeliveryQueue
+        from fake_servers import FakePracticumServer
+        from http_client import PracticumClient
+        from storage import StateStore
+        from subscriptions import SubscriptionRegistry
+
+        class BotFailingOnce:
+            def __init__(self):
+                self.sent = []
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                if not self.sent:
+                    self.sent.append(None)
+                    raise ValueError('Forbidden: bot was blocked by the user')
+                self.sent.append(text)
+
+        registry = SubscriptionRegistry()
+        subscription = registry.add('token', 1, timestamp=100)
+        store = StateStore()
+        bot = BotFailingOnce()
+        delivery = DeliveryQueue(bot, chat_interval=0).start()
+        client = PracticumClient()
+        with FakePracticumServer() as practicum:
+            practicum.set_status('token', 1, 'approved', 1000)
+            bot_engine = engine.Engine(
+                registry, None, client, store, delivery,
+                endpoint=practicum.endpoint,
+            )
+            bot_engine.poll(subscription)
+            assert delivery.join(timeout=5)
+            assert delivery.failed_count == 1
+            assert subscription.timestamp == 100
+            assert store.load_statuses(subscription.key) == {}
+
+            bot_engine.poll(subscription)
+            assert delivery.join(timeout=5)
+        delivery.stop()
+        client.close()
+        assert delivery.sent_count == 1
+        assert '"token__hw1.zip"' in bot.sent[-1]
+        assert store.load_statuses(subscription.key) == {'1': 'approved'}
+
+    def test_sigterm_stops_poll_loop(self):
+        import asyncio
+        import os
+        import signal
+
+        import engine
+        from subscriptions import SubscriptionRegistry
+
+        async def run():
+            asyncio.get_running_loop().call_later(
+                0.05, os.kill, os.getpid(), signal.SIGTERM
+            )
+            await asyncio.wait_for(engine.run_until_terminated(
+                engine.Engine(SubscriptionRegistry(), None)
+            ), 5)
+
+        asyncio.run(run())
+
+    def test_scheduler_cancel_from_another_thread(self):
+        import sys
+        import threading
+
+        import engine
+        from subscriptions import SubscriptionRegistry
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        registry = SubscriptionRegistry()
+        keys = [registry.add('token', chat_id).key for chat_id in range(5000)]
+        scheduler = engine.Scheduler(registry, period=1, jitter=0, tick=1)
+        scheduler.schedule_new(now=0)
+        errors = []
+
+        def cancel():
+            try:
+                for key in keys:
+                    scheduler.cancel(key)
+            except Exception as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=cancel)
+        thread.start()
+        now = 0
+        try:
+            while thread.is_alive():
+                now += 1
+                scheduler.due(now)
+        finally:
+            thread.join()
+            sys.setswitchinterval(switch_interval)
+        assert not errors
+        assert len(scheduler) == 0
+
+    def test_error_is_sent_again_after_recovery(self):
+        import engine
+        from dedup import Deduplicator
+        from exceptions import NoNewStatus
+        from subscriptions import SubscriptionRegistry
+
+        now = [0]
+        registry = SubscriptionRegistry()
+        subscription = registry.add('token', 1)
+        bot_engine = engine.Engine(registry, utils.MockTelegramBot())
+        bot_engine.dedup = Deduplicator(error_window=3600,
+                                        clock=lambda: now[0])
+        error = Exception('API недоступен')
+        assert bot_engine.process_response(subscription, error) == [
+            f'{error}'
+        ]
+        bot_engine.process_response(subscription, NoNewStatus('нет'))
+        now[0] = 2 * 24 * 3600
+        assert bot_engine.process_response(subscription, error) == [
+            f'{error}'
+        ]
@@ -0,0 +1,103 @@
+import time
+
+import pytest
+import requests
+import telegram
+
+from fake_servers import FakePracticumServer, FakeTelegramServer
+
+BOT_TOKEN = '123456:fake'
+
+
+@pytest.fixture
+def practicum():
+    with FakePracticumServer(seed=1) as server:
+        yield server
+
+
+@pytest.fixture
+def telegram_server():
+    with FakeTelegramServer(chat_interval=60) as server:
+        yield server
+
+
+class TestFakeServers:
+
+    def test_practicum_from_date(self, practicum, current_timestamp):
+        import homework
+
+        practicum.set_status('token', 1, 'approved', current_timestamp - 100)
+        practicum.set_status('token', 2, 'reviewing', current_timestamp)
+        headers = homework.make_headers('token')
+
+        response = homework.request_homework_statuses(
+            headers, current_timestamp - 100, requests, practicum.endpoint
+        )
+        assert [hw['id'] for hw in response['homeworks']] == [2, 1]
+        response = homework.request_homework_statuses(
+            headers, current_timestamp, requests, practicum.endpoint
+        )
+        assert [hw['id'] for hw in response['homeworks']] == [2]
+        assert response['current_date'] >= current_timestamp
+
+    def test_practicum_requires_token(self, practicum):
+        response = requests.get(
+            practicum.endpoint, params={'from_date': 0}
+        )
+        assert response.status_code == 401
+
+    def test_practicum_error_rate(self, practicum):
+        import homework
+
+        practicum.error_rate = 1
+        with pytest.raises(Exception, match='status_code 500'):
+            homework.request_homework_statuses(
+                homework.make_headers('token'), 0, requests,
+                practicum.endpoint,
+            )
+        assert practicum.errors_count == 1
+
+    def test_practicum_transitions(self, practicum):
+        practicum.transition_rate = 1
+        practicum.set_status('token', 1, 'reviewing')
+        status = practicum.statuses('token', 0)['homeworks'][0]['status']
+        assert status in ('approved', 'rejected')
+
+    def test_telegram_enforces_chat_rate_limit(self, telegram_server):
+        bot = telegram.Bot(token=BOT_TOKEN, base_url=telegram_server.base_url)
+        bot.send_message(chat_id=1, text='first')
+        with pytest.raises(telegram.error.RetryAfter) as error:
+            bot.send_message(chat_id=1, text='second')
+        assert error.value.retry_after == 60
+        bot.send_message(chat_id=2, text='other chat')
+        assert telegram_server.messages == [
+            ('1', 'first'), ('2', 'other chat')
+        ]
+        assert telegram_server.rate_limited_count == 1
+
+    def test_end_to_end_offline(self, practicum):
+        from delivery import DeliveryQueue
+        from engine import Engine
+        from http_client import PracticumClient
+        from subscriptions import SubscriptionRegistry
+
+        now = int(time.time())
+        registry = SubscriptionRegistry()
+        for index in range(5):
+            practicum.set_status(f'token{index}', 1, 'approved', now)
+            registry.add(f'token{index}', index + 1, timestamp=now - 1)
+
+        with FakeTelegramServer(global_rate=100) as telegram_server:
+            bot = telegram.Bot(
+                token=BOT_TOKEN, base_url=telegram_server.base_url
+            )
+            delivery = DeliveryQueue(bot, chat_interval=0).start()
+            client = PracticumClient()
+            engine = Engine(registry, bot, client, delivery=delivery,
+                            endpoint=practicum.endpoint)
+            for subscription in registry:
+                engine.poll(subscription)
+            assert delivery.join(timeout=10)
+            delivery.stop()
+            client.close()
+            assert len(telegram_server.messages) == 5
@@ -0,0 +1,100 @@
+import itertools
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    etag = None
+    current_date = itertools.count(1)
+
+    def do_GET(self):
+        if self.etag and self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps({
+            'homeworks': [], 'current_date': next(self.current_date)
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if self.etag:
+            self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server(monkeypatch):
+    monkeypatch.setattr(KeepAliveHandler, 'current_date', itertools.count(1))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+    server.server_close()
+
+
+class TestPracticumClient:
+
+    def test_connection_is_reused(self, local_server):
+        from http_client import PracticumClient
+
+        client = PracticumClient(pool_size=2)
+        for _ in range(5):
+            response = client.get(local_server, params={'from_date': 0})
+            assert response.json()['homeworks'] == []
+        stats = client.stats()
+        assert stats['requests'] == 5
+        assert stats['connections'] == 1
+        client.close()
+
+    def test_request_homework_statuses_accepts_client(self, local_server):
+        import homework
+        from http_client import PracticumClient
+
+        client = PracticumClient()
+        response = homework.request_homework_statuses(
+            homework.make_headers('token'), 0, client, local_server
+        )
+        assert response == {'homeworks': [], 'current_date': 1}
+        client.close()
+
+    def test_unchanged_body_is_not_decoded(self, local_server):
+        from exceptions import NotModified
+        from http_client import PracticumClient
+
+        client = PracticumClient()
+        headers = {'Authorization': 'OAuth token'}
+        response = client.get_statuses(headers, 0, 'key', local_server)
+        assert response == {'homeworks': [], 'current_date': 1}
+        with pytest.raises(NotModified) as error:
+            client.get_statuses(headers, 1, 'key', local_server)
+        assert error.value.current_date == 2
+        assert client.get_statuses(headers, 2, 'other', local_server)
+        assert client.stats()['cache_hits'] == 1
+        assert client.stats()['hit_ratio'] == pytest.approx(1 / 3)
+        client.close()
+
+    def test_etag_is_sent_back(self, local_server, monkeypatch):
+        from exceptions import NotModified
+        from http_client import PracticumClient
+
+        monkeypatch.setattr(KeepAliveHandler, 'etag', '"v1"')
+        client = PracticumClient()
+        headers = {'Authorization': 'OAuth token'}
+        client.get_statuses(headers, 0, 'key', local_server)
+        with pytest.raises(NotModified):
+            client.get_statuses(headers, 0, 'key', local_server)
+        assert client.stats()['not_modified'] == 1
+        client.close()
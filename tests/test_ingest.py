@@ -0,0 +1,89 @@
+import json
+import queue
+from urllib import error, request
+
+import pytest
+
+import utils
+
+UPDATE = {
+    'token': 'token',
+    'homeworks': [{'id': 1, 'homework_name': 'hw', 'status': 'approved'}],
+}
+
+
+def post(url: str, data, headers: dict = None) -> int:
+    req = request.Request(
+        url, data=json.dumps(data).encode(), headers=headers or {}
+    )
+    try:
+        with request.urlopen(req, timeout=5) as response:
+            return response.status
+    except error.HTTPError as http_error:
+        return http_error.code
+
+
+@pytest.fixture
+def ingest_server():
+    from ingest import start_ingest_server
+
+    inbox = queue.SimpleQueue()
+    server = start_ingest_server(inbox, 0, secret='secret')
+    yield inbox, f'http://127.0.0.1:{server.server_port}/push'
+    server.shutdown()
+    server.server_close()
+
+
+class TestIngest:
+
+    def test_pushed_update_notifies_all_chats_of_token(self, ingest_server):
+        import engine
+        from subscriptions import SubscriptionRegistry
+
+        inbox, url = ingest_server
+        registry = SubscriptionRegistry()
+        student = registry.add('token', 1, timestamp=100)
+        mentor = registry.add('token', 2, timestamp=100)
+        registry.add('other', 3)
+        bot = utils.MockTelegramBot()
+        bot_engine = engine.Engine(registry, bot)
+        bot_engine.inbox = inbox
+
+        assert post(url, UPDATE, {'X-Ingest-Secret': 'secret'}) == 202
+        assert bot_engine.ingest_pending() == 2
+        assert 'Ура!' in bot.text
+        assert student.timestamp == mentor.timestamp == 100
+        assert bot_engine.process_response(student, {
+            'homeworks': UPDATE['homeworks'], 'current_date': 200,
+        }) == []
+        assert student.timestamp == 200
+
+    @pytest.mark.parametrize('data, headers, status', [
+        (UPDATE, {}, 403),
+        (UPDATE, {'X-Ingest-Secret': 'wrong'}, 403),
+        ({'homeworks': UPDATE['homeworks']}, None, 400),
+        ({'token': 'token', 'homeworks': [{'homework_name': 'hw'}]},
+         None, 400),
+    ])
+    def test_invalid_push_is_rejected(self, ingest_server, data, headers,
+                                      status):
+        inbox, url = ingest_server
+        if headers is None:
+            headers = {'X-Ingest-Secret': 'secret'}
+        assert post(url, data, headers) == status
+        assert inbox.empty()
+
+    def test_spool(self, tmp_path):
+        from ingest import Spool
+
+        (tmp_path / '1.json').write_text(json.dumps(UPDATE))
+        (tmp_path / '2.json').write_text('{')
+        (tmp_path / '3.tmp').write_text('{')
+        inbox = queue.SimpleQueue()
+        assert Spool(str(tmp_path)).read(inbox) == 1
+        token, response = inbox.get_nowait()
+        assert token == 'token'
+        assert response['homeworks'] == UPDATE['homeworks']
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            '2.bad', '3.tmp'
+        ]
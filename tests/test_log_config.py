@@ -0,0 +1,41 @@
+import json
+import logging
+
+
+class TestLogConfig:
+
+    def test_json_formatter(self):
+        from log_config import JSONFormatter
+
+        record = logging.LogRecord(
+            'root', logging.INFO, __file__, 10, 'Статус %s', ('approved',),
+            None, func='parse_status',
+        )
+        data = json.loads(JSONFormatter().format(record))
+        assert data['message'] == 'Статус approved'
+        assert data['level'] == 'INFO'
+        assert data['func'] == 'parse_status'
+
+    def test_records_are_written_by_listener(self, tmp_path, monkeypatch):
+        from log_config import queue_handler, stop_listener
+
+        monkeypatch.setenv('LOG_FORMAT', 'json')
+        path = tmp_path / 'logs.log'
+        handler = queue_handler(str(path))
+        logger = logging.getLogger('test_log_config')
+        logger.propagate = False
+        logger.addHandler(handler)
+        try:
+            logger.warning('Сбой: %s', 'нет ответа')
+        finally:
+            logger.removeHandler(handler)
+            stop_listener(handler.listener)
+        record = json.loads(path.read_text(encoding='utf-8'))
+        assert record['message'] == 'Сбой: нет ответа'
+        assert record['logger'] == 'test_log_config'
+
+    def test_workers_log_to_own_files(self):
+        from log_config import worker_log_file
+
+        assert worker_log_file('host-0') == 'logs-host-0.log'
+        assert worker_log_file('host-1', 'var/bot.log') == 'var/bot-host-1.log'
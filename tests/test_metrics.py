@@ -0,0 +1,61 @@
+import urllib.request
+
+import pytest
+
+
+class TestMetrics:
+
+    def test_counter_and_histogram_render(self):
+        from metrics import Counter, Histogram, render
+
+        registry = []
+        counter = Counter('test_total', 'Test.', ['code'], registry=registry)
+        histogram = Histogram('test_seconds', 'Test.', buckets=(0.1, 1),
+                              registry=registry)
+        counter.labels(200).inc()
+        counter.labels(200).inc(2)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        text = render(registry)
+        assert 'test_total{code="200"} 3' in text
+        assert 'test_seconds_bucket{le="0.1"} 0' in text
+        assert 'test_seconds_bucket{le="1"} 1' in text
+        assert 'test_seconds_bucket{le="+Inf"} 2' in text
+        assert 'test_seconds_count 2' in text
+        assert '# TYPE test_seconds histogram' in text
+
+    def test_pipeline_is_instrumented(self, homework_module):
+        from metrics import CHECK_RESPONSE_FAILURES, PARSE_STATUS_RESULTS
+
+        approved = PARSE_STATUS_RESULTS.labels('approved').value()
+        homework_module.parse_status(
+            {'homework_name': 'hw', 'status': 'approved'}
+        )
+        assert PARSE_STATUS_RESULTS.labels('approved').value() == (
+            approved + 1
+        )
+
+        failures = CHECK_RESPONSE_FAILURES.labels('TypeError').value()
+        with pytest.raises(TypeError):
+            homework_module.check_response([])
+        with pytest.raises(homework_module.NoNewStatus):
+            homework_module.check_response(
+                {'homeworks': [], 'current_date': 1}
+            )
+        assert CHECK_RESPONSE_FAILURES.labels('TypeError').value() == (
+            failures + 1
+        )
+
+    def test_metrics_endpoint(self):
+        import metrics
+
+        server = metrics.start_http_server(0)
+        try:
+            url = f'http://127.0.0.1:{server.server_port}/metrics'
+            with urllib.request.urlopen(url) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'homework_api_request_seconds' in body
@@ -0,0 +1,91 @@
+import pytest
+
+
+class TestSchema:
+
+    def test_parse_response_matches_dict_path(self, homework_module):
+        from schema import changed_homeworks, parse_response, status_codes
+
+        response = {
+            'homeworks': [
+                {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'},
+                {'homework_name': 'hw1', 'status': 'approved',
+                 'reviewer_comment': 'Отлично'},
+            ],
+            'current_date': 1,
+        }
+        parsed = parse_response(response)
+        assert parsed.current_date == 1
+        assert [homework.key for homework in parsed.homeworks] == ['2', 'hw1']
+        assert parsed.homeworks[1].comment == 'Отлично'
+        assert not hasattr(parsed.homeworks[0], '__dict__')
+
+        statuses = {}
+        messages = [
+            message for _, _, message in homework_module.new_status_messages(
+                homework_module.check_response(response), {}
+            )
+        ]
+        changes = changed_homeworks(parsed.homeworks, statuses)
+        assert [homework.message for homework in changes] == messages
+        assert statuses == status_codes({'hw1': 'approved', '2': 'reviewing'})
+        assert parsed.homeworks[0].status == 'reviewing'
+        assert changed_homeworks(parsed.homeworks, statuses) == []
+
+    def test_known_statuses_are_skipped(self, homework_module):
+        homeworks = [
+            {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'},
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+        ]
+        statuses = {}
+        changes = homework_module.new_status_messages(homeworks, statuses)
+        assert [key for key, _, _ in changes] == ['1', '2']
+        assert homework_module.new_status_messages(homeworks, statuses) == []
+
+        homeworks[0] = dict(homeworks[0], status='approved')
+        changes = homework_module.new_status_messages(homeworks, statuses)
+        assert [(key, status) for key, status, _ in changes] == [
+            ('2', 'approved')
+        ]
+
+    @pytest.mark.parametrize('response, error, text', [
+        ([], TypeError, 'response'),
+        ({'current_date': 1}, KeyError, '"homeworks"'),
+        ({'homeworks': []}, KeyError, '"current_date"'),
+        ({'homeworks': {}, 'current_date': 1}, TypeError, 'homeworks'),
+        ({'homeworks': [], 'current_date': '1'}, TypeError, 'current_date'),
+        ({'homeworks': [{'status': 'approved'}], 'current_date': 1},
+         KeyError, 'homework_name'),
+        ({'homeworks': [{'homework_name': 'hw', 'status': 'unknown'}],
+          'current_date': 1}, Exception, 'HOMEWORK_VERDICTS'),
+    ])
+    def test_parse_response_errors(self, response, error, text):
+        from schema import parse_response
+
+        with pytest.raises(error, match=text):
+            parse_response(response)
+
+    def test_empty_homeworks(self):
+        from exceptions import NoNewStatus
+        from schema import parse_response
+
+        with pytest.raises(NoNewStatus):
+            parse_response({'homeworks': [], 'current_date': 1})
+
+    def test_homework_record_is_compact(self):
+        import sys
+
+        from schema import STATUSES, make_homework
+
+        item = {
+            'id': 1,
+            'homework_name': 'hw.zip',
+            'status': 'approved',
+            'reviewer_comment': '',
+            'date_updated': '2022-01-01T00:00:00Z',
+            'lesson_name': 'Урок 1',
+        }
+        homework = make_homework(item)
+        assert STATUSES[homework.code] == 'approved'
+        assert homework.status is make_homework(dict(item)).status
+        assert sys.getsizeof(homework) < sys.getsizeof(item)
@@ -0,0 +1,134 @@
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000
+
+    def __call__(self):
+        return self.now
+
+
+class TestSharding:
+
+    def test_ring_moves_few_keys_when_worker_joins(self):
+        from sharding import HashRing
+
+        keys = [f'token{index}' for index in range(2000)]
+        ring = HashRing(['w0', 'w1', 'w2', 'w3'])
+        owners = {key: ring.node(key) for key in keys}
+        counts = [list(owners.values()).count(f'w{i}') for i in range(4)]
+        assert min(counts) > 300
+
+        ring = HashRing(['w0', 'w1', 'w2', 'w3', 'w4'])
+        moved = [key for key in keys if ring.node(key) != owners[key]]
+        assert len(moved) < len(keys) * 0.3
+        assert all(ring.node(key) == 'w4' for key in moved)
+        assert HashRing().node('token') is None
+
+    def test_lease_expires(self, tmp_path):
+        from sharding import LeaseTable
+
+        clock = FakeClock()
+        leases = LeaseTable(str(tmp_path / 'state.sqlite3'), ttl=30,
+                            clock=clock)
+        leases.renew('w1')
+        leases.renew('w0')
+        assert leases.workers() == ['w0', 'w1']
+        clock.now += 20
+        leases.renew('w1')
+        clock.now += 20
+        assert leases.workers() == ['w1']
+        leases.release('w1')
+        assert leases.workers() == []
+        leases.close()
+
+    def test_workers_split_subscriptions(self, tmp_path):
+        import engine
+        from sharding import LeaseTable, Shard
+        from storage import SQLiteStateStore
+        from subscriptions import SubscriptionRegistry
+
+        path = str(tmp_path / 'state.sqlite3')
+        clock = FakeClock()
+        registry = SubscriptionRegistry()
+        for index in range(50):
+            registry.add(f'token{index}', index)
+        first = Shard('w0', LeaseTable(path, clock=clock), adopt_delay=10)
+        second = Shard('w1', LeaseTable(path, clock=clock), adopt_delay=10)
+        first.refresh()
+        clock.now += 10
+        assert second.refresh()
+
+        engines = [
+            engine.Engine(registry, None, store=SQLiteStateStore(path),
+                          shard=shard)
+            for shard in (first, second)
+        ]
+        polled = []
+        for bot_engine in engines:
+            bot_engine.scheduler.jitter = 0
+            bot_engine.scheduler.schedule_new(0)
+            polled.append({
+                sub.key for sub in bot_engine.scheduler.due(now=10 ** 6)
+            })
+        assert polled[0] and polled[1]
+        assert not polled[0] & polled[1]
+        assert len(polled[0] | polled[1]) == 50
+
+        subscription = registry.get(next(iter(polled[1])))
+        subscription.timestamp = 12345
+        engines[1].store.save_subscription(subscription)
+        engines[1].store.flush()
+        subscription.timestamp = 0
+        second.close()
+
+        assert first.refresh()
+        engines[0].rebalance()
+        assert first.workers == ['w0']
+        assert all(first.owns(sub) for sub in registry)
+        assert subscription.timestamp == 12345
+        first.close()
+        for bot_engine in engines:
+            bot_engine.store.close()
+
+    def test_new_owner_waits_for_previous_owner(self, tmp_path):
+        from sharding import LeaseTable, Shard
+        from subscriptions import SubscriptionRegistry
+
+        path = str(tmp_path / 'state.sqlite3')
+        clock = FakeClock()
+        registry = SubscriptionRegistry()
+        for index in range(50):
+            registry.add(f'token{index}', index)
+        first = Shard('w0', LeaseTable(path, clock=clock), adopt_delay=10)
+        assert all(first.owns(sub) for sub in registry)
+
+        second = Shard('w1', LeaseTable(path, clock=clock), adopt_delay=10)
+        assert first.refresh()
+        moved = [sub for sub in registry if not first.owns(sub)]
+        assert moved
+        assert not any(second.owns(sub) for sub in registry)
+
+        clock.now += 5
+        assert not second.refresh()
+        assert not any(second.owns(sub) for sub in moved)
+        clock.now += 5
+        assert second.refresh()
+        assert all(second.owns(sub) for sub in moved)
+        assert not second.refresh()
+
+        first.close()
+        assert second.refresh()
+        assert all(second.owns(sub) for sub in registry)
+        second.close()
+
+    def test_shared_database_uses_rollback_journal(self, tmp_path):
+        from sharding import LeaseTable
+        from storage import open_store
+
+        path = str(tmp_path / 'state.sqlite3')
+        store = open_store(path, 'DELETE')
+        leases = LeaseTable(path, journal_mode='DELETE')
+        mode = leases._connection.execute('PRAGMA journal_mode').fetchone()
+        assert mode == ('delete',)
+        leases.close()
+        store.close()
@@ -0,0 +1,86 @@
+class TestSQLiteStateStore:
+
+    def test_cursor_survives_restart(self, tmp_path):
+        from storage import SQLiteStateStore
+        from subscriptions import Subscription
+
+        path = str(tmp_path / 'state.sqlite3')
+        store = SQLiteStateStore(path, batch_size=100, flush_interval=60)
+        subscription = Subscription('token', 1, timestamp=100)
+        subscription.last_message = 'Работа взята на проверку ревьюером.'
+        store.save_subscription(subscription)
+        store.save_status(subscription.key, 'hw1', 'reviewing')
+        store.close()
+
+        store = SQLiteStateStore(path)
+        assert store.load_subscriptions() == [
+            ('token', '1', 100, 'Работа взята на проверку ревьюером.')
+        ]
+        assert store.load_statuses(('token', '1')) == {'hw1': 'reviewing'}
+        store.close()
+
+    def test_writes_are_batched(self, tmp_path):
+        import sqlite3
+
+        from storage import SQLiteStateStore
+        from subscriptions import Subscription
+
+        path = str(tmp_path / 'state.sqlite3')
+        store = SQLiteStateStore(path, batch_size=3, flush_interval=60)
+
+        def stored_count():
+            with sqlite3.connect(path) as connection:
+                return connection.execute(
+                    'SELECT COUNT(*) FROM subscriptions'
+                ).fetchone()[0]
+
+        for chat_id in range(2):
+            store.save_subscription(Subscription('token', chat_id))
+        assert stored_count() == 0
+        store.save_subscription(Subscription('token', 2))
+        assert stored_count() == 3
+        store.close()
+
+    def test_load_registry_restores_cursor(self, monkeypatch):
+        import engine
+        from storage import StateStore
+        from subscriptions import Subscription
+
+        monkeypatch.setattr(engine, 'PRACTICUM_TOKEN', None)
+        store = StateStore()
+        subscription = Subscription('token', 1, timestamp=100)
+        subscription.last_message = 'cached'
+        store.save_subscription(subscription)
+
+        registry = engine.load_registry(store)
+        restored = registry.get(('token', '1'))
+        assert restored.timestamp == 100
+        assert restored.last_message == 'cached'
+
+    def test_poll_loop_flushes_without_new_writes(
+            self, monkeypatch, tmp_path):
+        import asyncio
+        import sqlite3
+
+        import engine
+        from storage import SQLiteStateStore
+        from subscriptions import Subscription, SubscriptionRegistry
+
+        monkeypatch.setattr(engine, 'STATE_FLUSH_INTERVAL', 0)
+        path = str(tmp_path / 'state.sqlite3')
+        store = SQLiteStateStore(path, batch_size=100, flush_interval=3600)
+        store.save_subscription(Subscription('token', 1, timestamp=100))
+        bot_engine = engine.Engine(SubscriptionRegistry(), None, store=store)
+
+        async def run():
+            try:
+                await asyncio.wait_for(bot_engine.run_forever(0.01), 0.05)
+            except asyncio.TimeoutError:
+                pass
+
+        asyncio.run(run())
+        with sqlite3.connect(path) as connection:
+            assert connection.execute(
+                'SELECT COUNT(*) FROM subscriptions'
+            ).fetchone()[0] == 1
+        store.close()
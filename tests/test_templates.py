@@ -0,0 +1,78 @@
+import pytest
+
+
+class TestMessageRenderer:
+
+    @pytest.mark.parametrize('status', ['approved', 'reviewing', 'rejected'])
+    def test_default_matches_parse_status(self, status):
+        from homework import parse_status
+        from schema import make_homework
+        from templates import MessageRenderer
+
+        item = {
+            'id': 1, 'homework_name': 'hw.zip', 'status': status,
+            'reviewer_comment': 'Отлично',
+        }
+        renderer = MessageRenderer()
+        assert renderer.parse_mode is None
+        assert renderer.status(make_homework(item)) == parse_status(item)
+
+    def test_formats_escape_values_and_add_comment(self):
+        from schema import Homework
+        from templates import MessageRenderer
+
+        homework = Homework(1, 'hw_1<b>.zip', 2, 'Исправьте *всё*')
+        html = MessageRenderer(fmt='html')
+        assert html.parse_mode == 'HTML'
+        assert html.status(homework) == (
+            'Изменился статус проверки работы <b>hw_1&lt;b&gt;.zip</b>. '
+            'Работа проверена: у ревьюера есть замечания.\n'
+            '<i>Комментарий ревьюера:</i> Исправьте *всё*'
+        )
+        markdown = MessageRenderer(fmt='markdown', locale='en')
+        assert markdown.status(homework) == (
+            'Review status of *hw\\_1<b>.zip* has changed. '
+            'The work has been reviewed: the reviewer has remarks.\n'
+            '_Reviewer comment:_ Исправьте \\*всё\\*'
+        )
+        assert html.error('a < b') == 'a &lt; b'
+
+    @pytest.mark.parametrize('fmt', ['markdown', 'html'])
+    def test_long_comment_is_truncated(self, fmt):
+        from schema import Homework
+        from settings import MAX_MESSAGE_LENGTH
+        from templates import MessageRenderer
+
+        homework = Homework(1, 'hw.zip', 2, 'Исправьте <a> & *b*. ' * 1000)
+        message = MessageRenderer(fmt=fmt).status(homework)
+        assert MAX_MESSAGE_LENGTH - 10 < len(message) <= MAX_MESSAGE_LENGTH
+        assert message.endswith('…')
+
+    def test_fan_out_renders_once(self):
+        from schema import Homework
+        from templates import MessageRenderer
+
+        renderer = MessageRenderer(locale='en')
+        messages = {
+            renderer.status(Homework(1, 'hw.zip', 0))
+            for _ in range(1000)
+        }
+        assert len(messages) == 1
+        info = renderer.cache_info()
+        assert (info.misses, info.hits) == (1, 999)
+        assert renderer.status(Homework(1, 'hw.zip', 0), 'ru') != (
+            messages.pop()
+        )
+
+    def test_invalid_templates(self):
+        from templates import DEFAULT_TEMPLATES, MessageRenderer
+
+        with pytest.raises(ValueError):
+            MessageRenderer(DEFAULT_TEMPLATES, locale='en')
+        with pytest.raises(ValueError):
+            MessageRenderer(DEFAULT_TEMPLATES, fmt='rtf')
+        broken = {'ru': dict(DEFAULT_TEMPLATES['ru'], plain={
+            'status': 'Работа {homework_name}',
+        })}
+        with pytest.raises(ValueError):
+            MessageRenderer(broken)
@@ -0,0 +1,64 @@
+import math
+import random
+
+
+class TestTimingWheel:
+
+    def test_timers_fire_in_order_and_never_early(self):
+        from timing_wheel import TimingWheel
+
+        wheel = TimingWheel(start=0, tick=1, slots=4, levels=3)
+        for key, due in (('a', 3), ('b', 1.5), ('c', 40), ('d', 1000)):
+            wheel.add(key, due)
+        assert wheel.advance(1.9) == []
+        assert wheel.advance(2) == [(1.5, 'b')]
+        assert wheel.advance(39) == [(3, 'a')]
+        assert wheel.advance(40) == [(40, 'c')]
+        assert 'd' in wheel
+        assert wheel.advance(10 ** 6) == [(1000, 'd')]
+        assert not wheel
+
+    def test_cancel_and_reschedule(self):
+        from timing_wheel import TimingWheel
+
+        wheel = TimingWheel(start=100, tick=1, slots=4, levels=2)
+        wheel.add('a', 110)
+        wheel.add('b', 50)
+        wheel.add('a', 105)
+        assert wheel.cancel('b')
+        assert not wheel.cancel('b')
+        assert len(wheel) == 1
+        assert wheel.advance(1000) == [(105, 'a')]
+
+    def test_matches_sorted_reference(self):
+        from timing_wheel import TimingWheel
+
+        rng = random.Random(7)
+        wheel = TimingWheel(start=0, tick=1, slots=8, levels=3)
+        timers = {}
+        now = 0
+        for step in range(3000):
+            action = rng.random()
+            if action < 0.5:
+                key = rng.randrange(500)
+                due = now + rng.choice((0, rng.random() * 10,
+                                        rng.random() * 1000,
+                                        rng.random() * 10 ** 5))
+                wheel.add(key, due)
+                timers[key] = due
+            elif action < 0.6 and timers:
+                key = rng.choice(list(timers))
+                assert wheel.cancel(key)
+                del timers[key]
+            else:
+                now += rng.choice((1, 3, 50, 5000))
+                expected = sorted(
+                    (due, key) for key, due in timers.items()
+                    if math.ceil(due) <= now
+                )
+                fired = wheel.advance(now)
+                assert sorted(fired) == expected
+                assert all(due <= now for due, _ in fired)
+                for _, key in fired:
+                    del timers[key]
+        assert len(wheel) == len(timers)
@@ -0,0 +1,121 @@
+import math
+
+from settings import SCHEDULER_TICK, WHEEL_LEVELS, WHEEL_SLOTS
+
+
+class TimingWheel:
+    """Иерархическое колесо таймеров.
+
+    Уровень i состоит из slots ячеек шириной slots**i тиков. Таймер
+    кладётся в ячейку самого мелкого уровня, который дотягивается
+    до его срока, и спускается на уровень ниже, когда время доходит
+    до его ячейки. Добавление и отмена таймера - O(1), за тик
+    срабатывают сразу все таймеры ячейки. Пустые участки колеса
+    при большом сдвиге времени пропускаются целыми ячейками.
+    """
+
+    def __init__(self, start: float = 0, tick: float = SCHEDULER_TICK,
+                 slots: int = WHEEL_SLOTS, levels: int = WHEEL_LEVELS):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.current = math.floor(start / tick)
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._wheel = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._counts = [0] * levels
+        self._expired = {}
+        self._timers = {}
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def add(self, key, due: float) -> None:
+        """Ставит таймер key на время due, заменяя прежний таймер key."""
+        self.cancel(key)
+        self._place(key, due)
+
+    def cancel(self, key) -> bool:
+        """Отменяет таймер; возвращает False, если его не было."""
+        location = self._timers.pop(key, None)
+        if location is None:
+            return False
+        level, slot = location
+        if level < 0:
+            del self._expired[key]
+        else:
+            del self._wheel[level][slot][key]
+            self._counts[level] -= 1
+        return True
+
+    def advance(self, now: float) -> list:
+        """Сдвигает время до now и возвращает сработавшие таймеры.
+
+        Возвращается список (due, key), отсортированный по due;
+        сработавшие таймеры из колеса удаляются.
+        """
+        fired = self._take_expired()
+        target = math.floor(now / self.tick)
+        while self.current < target:
+            if not self._timers:
+                self.current = target
+                break
+            self.current += min(self._skip(), target - self.current)
+            for level in range(self.levels - 1, 0, -1):
+                if self.current % self._spans[level] == 0:
+                    self._cascade(level)
+            bucket = self._wheel[0][self.current % self.slots]
+            if bucket:
+                self._counts[0] -= len(bucket)
+                for key, due in bucket.items():
+                    del self._timers[key]
+                    fired.append((due, key))
+                bucket.clear()
+            fired.extend(self._take_expired())
+        fired.sort(key=lambda timer: timer[0])
+        return fired
+
+    def _skip(self) -> int:
+        """Число тиков до ближайшей ячейки, где могут быть таймеры."""
+        step = 1
+        for level in range(self.levels - 1):
+            if self._counts[level]:
+                break
+            span = self._spans[level + 1]
+            step = span - self.current % span
+        return step
+
+    def _place(self, key, due: float) -> None:
+        expiry = math.ceil(due / self.tick)
+        delta = expiry - self.current
+        if delta <= 0:
+            self._expired[key] = due
+            self._timers[key] = (-1, 0)
+            return
+        level = 0
+        while level < self.levels - 1 and delta >= self._spans[level + 1]:
+            level += 1
+        expiry = min(expiry, self.current + self._spans[self.levels] - 1)
+        slot = expiry // self._spans[level] % self.slots
+        self._wheel[level][slot][key] = due
+        self._counts[level] += 1
+        self._timers[key] = (level, slot)
+
+    def _cascade(self, level: int) -> None:
+        slot = self.current // self._spans[level] % self.slots
+        bucket = self._wheel[level][slot]
+        if not bucket:
+            return
+        self._wheel[level][slot] = {}
+        self._counts[level] -= len(bucket)
+        for key, due in bucket.items():
+            self._place(key, due)
+
+    def _take_expired(self) -> list:
+        fired = [(due, key) for key, due in self._expired.items()]
+        for _, key in fired:
+            del self._timers[key]
+        self._expired.clear()
+        return fired